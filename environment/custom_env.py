@@ -1,9 +1,17 @@
+import array
+import copy
+import heapq
+import math
 import random
+import itertools
+from collections import deque
 from enum import Enum
 
 import gymnasium as gym
 import numpy as np
 
+from environment.scenarios import ScenarioConfig
+
 
 class TaskType(Enum):
     HIGH = "high"
@@ -11,6 +19,35 @@ class TaskType(Enum):
     BASIC = "basic"
 
 
+# Order of the type codes stored in scenario traces and state snapshots
+TASK_TYPES = [TaskType.HIGH, TaskType.MEDIUM, TaskType.BASIC]
+TASK_TYPE_CODES = {task_type: code for code, task_type in enumerate(TASK_TYPES)}
+
+# Layout of WorkplaceEnv.get_state() buffers: a header of scalars, the
+# 625-word Mersenne Twister state of the arrival RNG, the TaskLedger
+# totals, then one row of (type code, assigned time, progress) per active,
+# queued and, with history, kept completed and failed task
+(
+    STATE_TIME,
+    STATE_TRUST,
+    STATE_LAST_HOURLY_BONUS,
+    STATE_LAST_ELAPSED,
+    STATE_ACTIVE,
+    STATE_QUEUED,
+    STATE_COMPLETED,
+    STATE_FAILED,
+    STATE_HISTORY,
+    STATE_SCENARIO,
+    STATE_TRACE_POS,
+    STATE_GAUSS_SET,
+    STATE_GAUSS,
+) = range(13)
+STATE_RNG = 13
+STATE_LEDGER = STATE_RNG + 625
+STATE_TASKS = STATE_LEDGER + 6 * len(TASK_TYPES)
+STATE_ROW = 3
+
+
 class Task:
     def __init__(self, task_type, assigned_time):
         self.type = task_type
@@ -41,54 +78,478 @@ class Task:
         self.progress = 0
         self.picked_up = False
         self.completed = False
+        self.failed = False
+
+
+class TaskQueue:
+    """FIFO of tasks waiting to be picked up.
+
+    Deadlines are also kept in a heap, so expiring tasks costs O(log n) per
+    expired task instead of a scan of the whole backlog every minute. Tasks
+    that were picked up or expired are dropped from the FIFO and the heap
+    lazily, once they reach the front.
+    """
+
+    def __init__(self):
+        self._fifo = deque()
+        self._deadlines = []
+        self._count = 0
+        self._seq = 0
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __iter__(self):
+        return (task for task in self._fifo if not (task.picked_up or task.failed))
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        queue = cls()
+        queue._fifo.extend(tasks)
+        queue._deadlines = [(task.deadline, seq, task) for seq, task in enumerate(tasks)]
+        heapq.heapify(queue._deadlines)
+        queue._count = queue._seq = len(tasks)
+        return queue
+
+    def head(self, n):
+        return list(itertools.islice(self, n))
+
+    def append(self, task):
+        self._fifo.append(task)
+        heapq.heappush(self._deadlines, (task.deadline, self._seq, task))
+        self._seq += 1
+        self._count += 1
+
+    def peek(self):
+        fifo = self._fifo
+        while fifo and (fifo[0].picked_up or fifo[0].failed):
+            fifo.popleft()
+        return fifo[0] if fifo else None
+
+    def popleft(self):
+        task = self.peek()
+        self._fifo.popleft()
+        self._count -= 1
+        return task
+
+    def next_deadline(self):
+        heap = self._deadlines
+        while heap and (heap[0][2].picked_up or heap[0][2].failed):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_expired(self, current_time):
+        heap = self._deadlines
+        if not heap or heap[0][0] > current_time:
+            return ()
+
+        expired = []
+        while heap and heap[0][0] <= current_time:
+            task = heapq.heappop(heap)[2]
+            if not (task.picked_up or task.failed):
+                task.failed = True
+                self._count -= 1
+                expired.append(task)
+        return expired
+
+
+class TaskLedger:
+    """Running totals of finished tasks per TaskType, in constant memory.
+
+    Each field is a list indexed by type code. Expired tasks failed while
+    still queued, late ones after being picked up; turnaround and slack are
+    summed over completed tasks (minutes from arrival, minutes left to the
+    deadline) and reward is the net reward, losses included.
+    """
+
+    FIELDS = ("completed", "expired", "late", "reward", "turnaround", "slack")
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        for field in self.FIELDS:
+            setattr(self, field, [0] * len(TASK_TYPES))
+        self.completed_count = 0
+        self.failed_count = 0
+
+    def record_completed(self, task, current_time):
+        code = TASK_TYPE_CODES[task.type]
+        self.completed[code] += 1
+        self.reward[code] += task.reward
+        self.turnaround[code] += current_time - task.assigned_time
+        self.slack[code] += task.deadline - current_time
+        self.completed_count += 1
+
+    def record_failed(self, task):
+        code = TASK_TYPE_CODES[task.type]
+        if task.picked_up:
+            self.late[code] += 1
+            self.reward[code] -= task.loss_late
+        else:
+            self.expired[code] += 1
+            self.reward[code] -= task.loss
+        self.failed_count += 1
+
+    def to_list(self):
+        return [value for field in self.FIELDS for value in getattr(self, field)]
+
+    def load_list(self, values):
+        n = len(TASK_TYPES)
+        for i, field in enumerate(self.FIELDS):
+            setattr(self, field, list(values[i * n:(i + 1) * n]))
+        self.completed_count = sum(self.completed)
+        self.failed_count = sum(self.expired) + sum(self.late)
+
+    def summary(self):
+        summary = {}
+        for code, task_type in enumerate(TASK_TYPES):
+            completed = self.completed[code]
+            summary[task_type.value] = {
+                "completed": completed,
+                "expired": self.expired[code],
+                "late": self.late[code],
+                "reward": self.reward[code],
+                "mean_turnaround": self.turnaround[code] / completed if completed else 0.0,
+                "mean_slack": self.slack[code] / completed if completed else 0.0,
+            }
+        return summary
+
+
+def stacked_action_masks(vec_env):
+    """Action masks of every env in a vector env as one (num_envs, n_actions) array"""
+    return np.stack(vec_env.env_method("action_masks"))
+
+
+class LazyInfo(dict):
+    """Step info whose diagnostics are only computed from the env when read.
+
+    Keys written by wrappers (e.g. SB3's "TimeLimit.truncated") are stored
+    as usual; the env's own keys are looked up through _get_info() on access,
+    and any other missing key fails without touching the env. Copies and
+    pickles are plain dicts of the stored keys, so vector envs that deepcopy
+    their infos every step do not copy the env along.
+    """
+
+    ENV_KEYS = frozenset([
+        "trust_points",
+        "completed_tasks",
+        "failed_tasks",
+        "active_tasks",
+        "available_tasks",
+        "time_left",
+        "action_mask",
+        "elapsed",
+    ])
+
+    def __init__(self, env):
+        super().__init__()
+        self._env = env
+
+    def __missing__(self, key):
+        if key not in self.ENV_KEYS:
+            raise KeyError(key)
+        return self._env._get_info()[key]
+
+    def __contains__(self, key):
+        if dict.__contains__(self, key):
+            return True
+        return key in self.ENV_KEYS and (key != "elapsed" or self._env.event_driven)
+
+    def get(self, key, default=None):
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        if key not in self:
+            return default
+        return self[key]
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
 
 
 class WorkplaceEnv(gym.Env):
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, event_driven=False, config=None, lean=False, scenario_bank=None,
+                 recent_tasks=None):
 
         super().__init__()
-        self.TOTAL_MINUTES = 480
-        self.MAX_WORKING_TASKS = 3
-        self.STARTING_TRUST = 100
-        self.HOURLY_BONUS = 30
+        if config is None and scenario_bank is not None:
+            config = scenario_bank.config
+        self.config = config or ScenarioConfig()
+        # reset(options={"scenario": i}) replays arrival trace i of the bank
+        # instead of drawing arrivals at random
+        self.scenario_bank = scenario_bank
+        self.TOTAL_MINUTES = self.config.total_minutes
+        self.NUM_WORKERS = self.config.num_workers
+        self.MAX_WORKING_TASKS = self.config.max_working_tasks
+        self.MAX_VISIBLE_TASKS = self.config.max_visible_tasks
+        self.STARTING_TRUST = self.config.starting_trust
+        self.HOURLY_BONUS = self.config.hourly_bonus
+
+        self._task_types = [TaskType(name) for name in self.config.type_weights]
+        self._type_cum_weights = list(
+            itertools.accumulate(self.config.type_weights.values())
+        )
+        self._poisson_threshold = math.exp(-self.config.arrival_rate)
+        self.random = random.Random()
 
         self.observation_space = gym.spaces.Box(
             low=np.array([0, 0, 0, 0, 0]),
-            high=np.array([480, 200, 3, 10, 1]),
+            high=np.array([
+                self.TOTAL_MINUTES,
+                200,
+                self.MAX_WORKING_TASKS,
+                self.MAX_VISIBLE_TASKS,
+                1,
+            ]),
             dtype=np.float32,
         )
 
         self.action_space = gym.spaces.Discrete(6)
 
         self.render_mode = render_mode
+        # Semi-MDP mode: action 0 waits until the next arrival, deadline or
+        # hour boundary instead of a single minute
+        self.event_driven = event_driven
+
+        # Lean mode writes observations into a reused buffer and returns a
+        # shared LazyInfo on non-terminal steps, so a steady-state step
+        # allocates nothing that outlives it. The returned observation is
+        # overwritten by the next step; copy it if you keep it.
+        self.lean = lean
+        self._obs_buffer = np.zeros(5, dtype=np.float32)
+        self._action_mask = np.ones(self.action_space.n, dtype=bool)
+
+        # Finished tasks are always counted in the ledger. By default every
+        # one is also kept in completed_tasks/failed_tasks; with recent_tasks
+        # set those become rings of the last recent_tasks tasks, so memory
+        # no longer grows with the horizon
+        self.recent_tasks = recent_tasks
+        self.ledger = TaskLedger()
+        self._lazy_info = LazyInfo(self)
         self.reset()
 
 
 
     def reset(self, *, seed=None, options=None):
         super().reset(seed=seed)
+        if seed is not None:
+            self.random.seed(seed)
 
         self.current_time = 0
         self.trust_points = self.STARTING_TRUST
         self.active_tasks = []
-        self.available_tasks = []
-        self.failed_tasks = []
-        self.completed_tasks = []
+        self.available_tasks = TaskQueue()
+        self.failed_tasks = self._history()
+        self.completed_tasks = self._history()
+        self.ledger.clear()
         self.last_hourly_bonus = 0
+        self._last_elapsed = 0
+        self._lazy_info.clear()
+
+        self.scenario_id = None
+        self._trace_minutes = None
+        if options and options.get("scenario") is not None:
+            if self.scenario_bank is None:
+                raise ValueError("Replaying a scenario needs WorkplaceEnv(scenario_bank=...)")
+            trace = self.scenario_bank.trace(options["scenario"])
+            self.scenario_id = options["scenario"]
+            self._trace_minutes = trace["minute"].tolist()
+            self._trace_types = trace["type"].tolist()
+            self._trace_pos = 0
 
         self._generate_random_tasks()
+        self._update_action_mask()
 
         return self._get_observation(), {}
 
+    def _history(self, tasks=()):
+        if self.recent_tasks is None:
+            return list(tasks)
+        return deque(tasks, maxlen=self.recent_tasks)
+
+    def get_state(self, history=False, out=None):
+        """Snapshot the simulator, including the arrival RNG, into an int64 array.
+
+        Without history only the ledger totals of completed and failed tasks
+        are kept, so the snapshot size depends on the active and queued tasks
+        alone. Pass out (a previous snapshot's array) to reuse its memory;
+        a view of out is returned when it is large enough.
+        """
+        queued = list(self.available_tasks)
+        tasks = self.active_tasks + queued
+        if history:
+            tasks = tasks + list(self.completed_tasks) + list(self.failed_tasks)
+
+        size = STATE_TASKS + STATE_ROW * len(tasks)
+        state = out[:size] if out is not None and len(out) >= size else np.empty(size, dtype=np.int64)
+
+        _, words, gauss = self.random.getstate()
+        state[STATE_TIME] = self.current_time
+        state[STATE_TRUST] = self.trust_points
+        state[STATE_LAST_HOURLY_BONUS] = self.last_hourly_bonus
+        state[STATE_LAST_ELAPSED] = self._last_elapsed
+        state[STATE_ACTIVE] = len(self.active_tasks)
+        state[STATE_QUEUED] = len(queued)
+        state[STATE_COMPLETED] = len(self.completed_tasks)
+        state[STATE_FAILED] = len(self.failed_tasks)
+        state[STATE_HISTORY] = history
+        state[STATE_SCENARIO] = -1 if self.scenario_id is None else self.scenario_id
+        state[STATE_TRACE_POS] = self._trace_pos if self._trace_minutes is not None else 0
+        state[STATE_GAUSS_SET] = gauss is not None
+        state[STATE_GAUSS] = np.float64(gauss or 0.0).view(np.int64)
+        # The words are 32 bit; packing them with array.array first halves the copy time
+        state[STATE_RNG:STATE_LEDGER] = np.frombuffer(array.array("I", words), dtype=np.uint32)
+        state[STATE_LEDGER:STATE_TASKS] = self.ledger.to_list()
+
+        if tasks:
+            state[STATE_TASKS:].reshape(-1, STATE_ROW)[:] = [
+                (TASK_TYPE_CODES[task.type], task.assigned_time, task.progress) for task in tasks
+            ]
+        return state
+
+    def set_state(self, state):
+        """Restore a get_state() snapshot.
+
+        Snapshots without history roll the completed and failed lists back
+        by dropping the tasks finished since, which is exact when restoring
+        an earlier point of the same episode (a recent_tasks ring may come
+        back shorter); full-history lists that come out short are padded
+        with None. A replayed scenario continues from
+        the bank if this env has one and with random arrivals otherwise.
+        """
+        self.current_time = int(state[STATE_TIME])
+        self.trust_points = int(state[STATE_TRUST])
+        self.last_hourly_bonus = int(state[STATE_LAST_HOURLY_BONUS])
+        self._last_elapsed = int(state[STATE_LAST_ELAPSED])
+        gauss = float(state[STATE_GAUSS:STATE_GAUSS + 1].view(np.float64)[0]) if state[STATE_GAUSS_SET] else None
+        self.random.setstate((3, tuple(state[STATE_RNG:STATE_LEDGER].tolist()), gauss))
+        finished_before = (self.ledger.completed_count, self.ledger.failed_count)
+        self.ledger.load_list(state[STATE_LEDGER:STATE_TASKS].tolist())
+
+        tasks = []
+        for code, assigned_time, progress in state[STATE_TASKS:].reshape(-1, STATE_ROW).tolist():
+            task = Task(TASK_TYPES[code], assigned_time)
+            task.progress = progress
+            tasks.append(task)
+
+        n_active = int(state[STATE_ACTIVE])
+        n_queued = int(state[STATE_QUEUED])
+        n_completed = int(state[STATE_COMPLETED])
+        n_failed = int(state[STATE_FAILED])
+        for task in tasks[:n_active]:
+            task.picked_up = True
+        self.active_tasks = tasks[:n_active]
+        self.available_tasks = TaskQueue.from_tasks(tasks[n_active:n_active + n_queued])
+
+        if state[STATE_HISTORY]:
+            done = n_active + n_queued
+            self.completed_tasks = self._history(tasks[done:done + n_completed])
+            self.failed_tasks = self._history(tasks[done + n_completed:done + n_completed + n_failed])
+            for task in self.completed_tasks:
+                task.completed = True
+            for task in self.failed_tasks:
+                task.failed = True
+        else:
+            finished_after = (self.ledger.completed_count, self.ledger.failed_count)
+            for tasks, before, after in zip((self.completed_tasks, self.failed_tasks), finished_before, finished_after):
+                for _ in range(min(before - after, len(tasks))):
+                    tasks.pop()
+                if self.recent_tasks is None:
+                    tasks.extend([None] * (after - len(tasks)))
+
+        scenario = int(state[STATE_SCENARIO])
+        if scenario >= 0 and self.scenario_bank is not None:
+            if scenario != self.scenario_id or self._trace_minutes is None:
+                trace = self.scenario_bank.trace(scenario)
+                self._trace_minutes = trace["minute"].tolist()
+                self._trace_types = trace["type"].tolist()
+            self._trace_pos = int(state[STATE_TRACE_POS])
+            self.scenario_id = scenario
+        else:
+            self._trace_minutes = None
+            self.scenario_id = None
+
+        self._lazy_info.clear()
+        self._update_action_mask()
+
+    def action_masks(self):
+        """Boolean mask of the actions that do not fail with -1 right now.
+
+        Waiting (0 and 5) is always allowed, picking up needs a queued task
+        and a free slot, and working on index i needs i active tasks. In
+        lean mode the returned array is reused by the next step.
+        """
+        return self._action_mask if self.lean else self._action_mask.copy()
+
+    def _update_action_mask(self):
+        # Only the pick-up bit and the number of workable slots can change,
+        # and both follow from the two counts
+        mask = self._action_mask
+        active = len(self.active_tasks)
+        mask[1] = active < self.MAX_WORKING_TASKS and len(self.available_tasks) > 0
+        mask[2] = active > 0
+        mask[3] = active > 1
+        mask[4] = active > 2
+
     def _generate_random_tasks(self):
-        if random.random() < 0.3:
-            task_type = random.choices(
-                [TaskType.HIGH, TaskType.MEDIUM, TaskType.BASIC],
-                weights=[0.2, 0.3, 0.5],
-            )[0]
+        if self._trace_minutes is not None:
+            task_types = self._replay_arrivals()
+        else:
+            task_types = self._draw_arrivals()
 
+        for task_type in task_types:
             task = Task(task_type, self.current_time)
             self.available_tasks.append(task)
+        return len(task_types) > 0
+
+    def _draw_arrivals(self):
+        if self.config.arrival_process == "poisson":
+            arrivals = self._poisson_arrivals()
+        else:
+            arrivals = 1 if self.random.random() < self.config.arrival_rate else 0
+
+        if not arrivals:
+            return ()
+        return self.random.choices(
+            self._task_types,
+            cum_weights=self._type_cum_weights,
+            k=arrivals,
+        )
+
+    def _replay_arrivals(self):
+        minutes = self._trace_minutes
+        start = end = self._trace_pos
+        while end < len(minutes) and minutes[end] <= self.current_time:
+            end += 1
+
+        if end == start:
+            return ()
+        self._trace_pos = end
+        return [TASK_TYPES[code] for code in self._trace_types[start:end]]
+
+    def _poisson_arrivals(self):
+        # Knuth's method; the rates we simulate are a few tasks per minute
+        arrivals = 0
+        p = self.random.random()
+        while p > self._poisson_threshold:
+            arrivals += 1
+            p *= self.random.random()
+        return arrivals
+
+    def set_observation_buffer(self, out):
+        """Have lean mode write observations into a caller-owned float32 array of shape (5,)"""
+        if out.shape != self._obs_buffer.shape or out.dtype != np.float32:
+            raise ValueError("Observation buffer must be a float32 array of shape (5,)")
+        self._obs_buffer = out
 
     def _get_observation(self):
         time_norm = self.current_time / self.TOTAL_MINUTES
@@ -96,14 +557,23 @@ class WorkplaceEnv(gym.Env):
         trust_norm = self.trust_points / self.STARTING_TRUST
 
         num_active = len(self.active_tasks)
-        num_avaialbe = min(len(self.available_tasks), 10)
+        num_avaialbe = min(len(self.available_tasks), self.MAX_VISIBLE_TASKS)
         next_urgency = 0
 
-        if self.available_tasks:
-            next_task = self.available_tasks[0]
+        next_task = self.available_tasks.peek()
+        if next_task is not None:
             time_left = next_task.deadline - self.current_time
             next_urgency = max(0, 1 - (time_left / next_task.window))
 
+        if self.lean:
+            obs = self._obs_buffer
+            obs[0] = time_norm
+            obs[1] = trust_norm
+            obs[2] = num_active
+            obs[3] = num_avaialbe
+            obs[4] = next_urgency
+            return obs
+
         return np.array(
             [time_norm, trust_norm, num_active, num_avaialbe, next_urgency],
             dtype=np.float32,
@@ -112,29 +582,23 @@ class WorkplaceEnv(gym.Env):
     def step(self, action):
         reward = 0
         terminated = False
+        elapsed = 1
 
         if action == 0:
-            pass
-        elif action == 1:
-            reward += self._pick_up_task()
-
-        elif action >= 2 and action <= 4:
-            task_index = action - 2
-            reward += self._work_on_task(task_index)
-
-        self.current_time += 1
+            if self.event_driven:
+                wait_reward, elapsed = self._wait_for_event()
+                reward += wait_reward
+            else:
+                reward += self._advance_clock()
+        else:
+            if action == 1:
+                reward += self._pick_up_task()
 
-        self._generate_random_tasks()
+            elif action >= 2 and action <= 4:
+                task_index = action - 2
+                reward += self._work_on_task(task_index)
 
-        reward += self._check_deadlines()
-
-        if (
-            self.current_time % 60 == 0
-            and self.current_time > self.last_hourly_bonus
-        ):
-            self.trust_points += self.HOURLY_BONUS
-            reward += 5
-            self.last_hourly_bonus = self.current_time
+            reward += self._advance_clock()
 
         if self.trust_points <= 0:
             terminated = True
@@ -143,6 +607,16 @@ class WorkplaceEnv(gym.Env):
             terminated = True
             if self.trust_points > 0:
                 reward += 50
+
+        self._last_elapsed = elapsed
+        self._update_action_mask()
+
+        if self.lean:
+            if not terminated:
+                return self._get_observation(), reward, False, False, self._lazy_info
+            # Vector envs keep the terminal observation past the next reset
+            return self._get_observation().copy(), reward, True, False, self._get_info()
+
         return (
             self._get_observation(),
             reward,
@@ -151,6 +625,55 @@ class WorkplaceEnv(gym.Env):
             self._get_info(),
         )
 
+    def _advance_clock(self):
+        reward = 0
+        self.current_time += 1
+
+        self._last_arrival = self._generate_random_tasks()
+
+        reward += self._check_deadlines()
+
+        if (
+            self.current_time % 60 == 0
+            and self.current_time > self.last_hourly_bonus
+        ):
+            self.trust_points += self.HOURLY_BONUS
+            reward += 5
+            self.last_hourly_bonus = self.current_time
+
+        return reward
+
+    def _next_scheduled_event(self):
+        next_event = min(
+            (self.current_time // 60 + 1) * 60,
+            self.TOTAL_MINUTES,
+        )
+        next_deadline = self.available_tasks.next_deadline()
+        if next_deadline is not None:
+            next_event = min(next_event, next_deadline)
+        for task in self.active_tasks:
+            next_event = min(next_event, task.deadline)
+        return next_event
+
+    def _wait_for_event(self):
+        """Advance minute by minute until something the agent can react to happens.
+
+        Each skipped minute goes through _advance_clock exactly as repeated
+        action 0 steps would, so rewards and the random task stream match the
+        one-minute-per-step env; only the observation, info and the policy
+        call in between are skipped.
+        """
+        start_time = self.current_time
+        next_event = self._next_scheduled_event()
+        reward = 0
+
+        while True:
+            reward += self._advance_clock()
+            if self._last_arrival or self.current_time >= next_event:
+                break
+
+        return reward, self.current_time - start_time
+
     def _pick_up_task(self):
         if (
             not self.available_tasks
@@ -158,17 +681,37 @@ class WorkplaceEnv(gym.Env):
         ):
             return -1
 
-        task = self.available_tasks.pop(0)
-        task.picked_up = True
-        self.active_tasks.append(task)
-        return 1
+        # Every worker grabs the next task, as long as there is room
+        picked = 0
+        while (
+            picked < self.NUM_WORKERS
+            and self.available_tasks
+            and len(self.active_tasks) < self.MAX_WORKING_TASKS
+        ):
+            task = self.available_tasks.popleft()
+            task.picked_up = True
+            self.active_tasks.append(task)
+            picked += 1
+        return picked
 
     def _work_on_task(self, task_index):
 
         if task_index >= len(self.active_tasks):
             return -1
 
-        task = self.active_tasks[task_index]
+        if self.NUM_WORKERS == 1:
+            return self._work_one_minute(self.active_tasks[task_index])
+
+        # The team works on consecutive tasks starting at task_index, one
+        # worker per task, wrapping around so no worker idles while a task
+        # goes unworked
+        tasks = self.active_tasks[task_index:] + self.active_tasks[:task_index]
+        reward = 0
+        for task in tasks[:self.NUM_WORKERS]:
+            reward += self._work_one_minute(task)
+        return reward
+
+    def _work_one_minute(self, task):
         task.progress += 1
 
         if task.progress >= task.duration:
@@ -176,6 +719,7 @@ class WorkplaceEnv(gym.Env):
             self.trust_points += task.reward
             reward = task.reward
             self.completed_tasks.append(task)
+            self.ledger.record_completed(task, self.current_time)
             self.active_tasks.remove(task)
             return reward
 
@@ -184,16 +728,14 @@ class WorkplaceEnv(gym.Env):
     def _check_deadlines(self):
         reward = 0
 
-        expired_available = []
-        for task in self.available_tasks:
-            if self.current_time >= task.deadline:
-                expired_available.append(task)
-
-        for task in expired_available:
-            self.available_tasks.remove(task)
+        for task in self.available_tasks.pop_expired(self.current_time):
             self.trust_points -= task.loss
             reward -= task.loss
             self.failed_tasks.append(task)
+            self.ledger.record_failed(task)
+
+        if not self.active_tasks:
+            return reward
 
         expired_active = []
         for task in self.active_tasks:
@@ -201,27 +743,33 @@ class WorkplaceEnv(gym.Env):
                 expired_active.append(task)
 
         for task in expired_active:
+            task.failed = True
             self.active_tasks.remove(task)
             self.trust_points -= task.loss_late
             reward -= task.loss_late
             self.failed_tasks.append(task)
+            self.ledger.record_failed(task)
 
         return reward
 
     def _get_info(self):
-        return {
+        info = {
             "trust_points": self.trust_points,
-            "completed_tasks": len(self.completed_tasks),
-            "failed_tasks": len(self.failed_tasks),
+            "completed_tasks": self.ledger.completed_count,
+            "failed_tasks": self.ledger.failed_count,
             "active_tasks": len(self.active_tasks),
             "available_tasks": len(self.available_tasks),
             "time_left": self.TOTAL_MINUTES - self.current_time,
+            "action_mask": self.action_masks(),
         }
+        if self.event_driven:
+            info["elapsed"] = self._last_elapsed
+        return info
 
     def render(self):
         if self.render_mode == "human":
             print(
-                f"Time: {self.current_time:3d}/480 | Trust: {self.trust_points:3d} | "
+                f"Time: {self.current_time:3d}/{self.TOTAL_MINUTES} | Trust: {self.trust_points:3d} | "
                 f"Active: {len(self.active_tasks)} | Available: {len(self.available_tasks)} | "
-                f"Done: {len(self.completed_tasks)} | Failed: {len(self.failed_tasks)}"
+                f"Done: {self.ledger.completed_count} | Failed: {self.ledger.failed_count}"
             )
@@ -4,12 +4,17 @@ import math
 
 class GameVisualization:
 
-    def __init__(self, env):
+    def __init__(self, env, render_mode="human"):
         pygame.init()
         self.env = env
+        self.render_mode = render_mode
         self.width, self.height = 1400, 900
-        self.screen = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption("Workplace Agent - Survival Mode")
+        if render_mode == "rgb_array":
+            # Off-screen: render() returns the frame and no window is opened
+            self.screen = pygame.Surface((self.width, self.height))
+        else:
+            self.screen = pygame.display.set_mode((self.width, self.height))
+            pygame.display.set_caption("Workplace Agent - Survival Mode")
 
 
         self.COLORS = {
@@ -95,10 +100,10 @@ class GameVisualization:
         self.draw_progress_bar(
             self.screen, time_x, time_y + 30, 300, 25, time_progress,
             self.COLORS['blue_light'], self.COLORS['green_light'],
-            f"{self.env.current_time}m / 480m"
+            f"{self.env.current_time}m / {self.env.TOTAL_MINUTES}m"
         )
 
-        remaining = 480 - self.env.current_time
+        remaining = self.env.TOTAL_MINUTES - self.env.current_time
         remaining_text = self.fonts['small'].render(f"{remaining} minutes remaining", True, self.COLORS['white'])
         self.screen.blit(remaining_text, (time_x, time_y + 65))
 
@@ -118,7 +123,7 @@ class GameVisualization:
         trust_text = self.fonts['large'].render(f"{self.env.trust_points}", True, trust_color)
         self.screen.blit(trust_text, (x + 20, y + 50))
 
-        trust_progress = max(0, self.env.trust_points / 100)
+        trust_progress = max(0, self.env.trust_points / self.env.STARTING_TRUST)
         bar_color = self.COLORS['success'] if trust_progress > 0.5 else (
             self.COLORS['warning'] if trust_progress > 0.2 else self.COLORS['danger']
         )
@@ -170,7 +175,7 @@ class GameVisualization:
             text_rect = no_tasks_text.get_rect(center=no_tasks_rect.center)
             self.screen.blit(no_tasks_text, text_rect)
         else:
-            for i, task in enumerate(self.env.available_tasks[:5]):
+            for i, task in enumerate(self.env.available_tasks.head(5)):
                 self.draw_task_card(x, y + i * 65, width, 55, task, active=False)
 
     def draw_task_card(self, x, y, width, height, task, active=True):
@@ -215,10 +220,12 @@ class GameVisualization:
     def draw_statistics(self):
         x, y = self.MARGIN, 650
 
+        completed = self.env.ledger.completed_count
+        failed = self.env.ledger.failed_count
         stats = [
-            ("Completed", len(self.env.completed_tasks), self.COLORS['success']),
-            ("Failed", len(self.env.failed_tasks), self.COLORS['danger']),
-            ("Success Rate", f"{len(self.env.completed_tasks)/(max(1, len(self.env.completed_tasks) + len(self.env.failed_tasks)))*100:.0f}%", self.COLORS['primary'])
+            ("Completed", completed, self.COLORS['success']),
+            ("Failed", failed, self.COLORS['danger']),
+            ("Success Rate", f"{completed/(max(1, completed + failed))*100:.0f}%", self.COLORS['primary'])
         ]
 
         card_width = 180
@@ -267,6 +274,11 @@ class GameVisualization:
         self.draw_statistics()
         self.draw_action_legend()
 
+        return self.present()
+
+    def present(self):
+        if self.render_mode == "rgb_array":
+            return pygame.surfarray.array3d(self.screen).swapaxes(0, 1)
         pygame.display.flip()
 
     def close(self):
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import random
+
+import numpy as np
+
+from environment.custom_env import TASK_TYPES, WorkplaceEnv
+from environment.scenarios import SCENARIOS, ScenarioConfig, get_scenario
+
+
+# One row per arrival; type indexes TASK_TYPES
+ARRIVAL_DTYPE = np.dtype([("minute", "<i4"), ("type", "i1")])
+
+
+class ScenarioBank:
+    """Precomputed arrival traces, memory-mapped from a directory.
+
+    arrivals.npy holds every scenario's arrivals back to back and
+    offsets.npy (length count + 1) marks where scenario i starts and ends.
+    Both are opened read-only with mmap, so worker processes that open (or
+    unpickle) the same bank share the pages instead of copying them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.config = ScenarioConfig.from_dict(self.meta["config"])
+        self.arrivals = np.load(os.path.join(path, "arrivals.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def trace(self, scenario):
+        if not 0 <= scenario < len(self):
+            raise IndexError(f"Scenario {scenario} not in bank of {len(self)}")
+        return self.arrivals[self.offsets[scenario]:self.offsets[scenario + 1]]
+
+    # Pickle by path so process pools reopen the mmap instead of copying arrays
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def __repr__(self):
+        return f"ScenarioBank({self.path!r}, {len(self)} x {self.config.name})"
+
+    @classmethod
+    def build(cls, path, count, config=None, seed=0):
+        """Draw count arrival traces with the environment's own arrival process"""
+        config = config or ScenarioConfig()
+        env = WorkplaceEnv(config=config)
+        codes = {task_type: code for code, task_type in enumerate(TASK_TYPES)}
+
+        traces = []
+        offsets = [0]
+        for scenario in range(count):
+            env.random = random.Random(seed * 1_000_003 + scenario)
+            rows = []
+            for minute in range(config.total_minutes + 1):
+                rows.extend((minute, codes[task_type]) for task_type in env._draw_arrivals())
+            traces.append(np.array(rows, dtype=ARRIVAL_DTYPE))
+            offsets.append(offsets[-1] + len(rows))
+
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "arrivals.npy"), np.concatenate(traces))
+        np.save(os.path.join(path, "offsets.npy"), np.array(offsets, dtype=np.int64))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"config": config.to_dict(), "seed": seed, "count": count}, f, indent=2)
+        return cls(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute a bank of arrival traces for paired evaluation")
+    parser.add_argument("--out", default="scenarios/default")
+    parser.add_argument("--scenarios", type=int, default=1000)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="default")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bank = ScenarioBank.build(args.out, args.scenarios, get_scenario(args.scenario), args.seed)
+    size = sum(os.path.getsize(os.path.join(args.out, name)) for name in ("arrivals.npy", "offsets.npy"))
+    print(f"Wrote {bank}")
+    print(f"  Arrivals: {len(bank.arrivals):,} ({len(bank.arrivals) / len(bank):.1f} per scenario)")
+    print(f"  Size: {size / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
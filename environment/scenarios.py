@@ -0,0 +1,92 @@
+DEFAULT_TYPE_WEIGHTS = {"high": 0.2, "medium": 0.3, "basic": 0.5}
+
+# Actions 2..4 start the team's work at active slot 0, 1 or 2
+WORK_ACTIONS = 3
+
+
+class ScenarioConfig:
+    """Size and load of a simulated workplace.
+
+    The defaults reproduce the original single-worker 8 hour day.
+    arrival_rate is the expected number of new tasks per minute: with the
+    "bernoulli" process at most one task arrives per minute (rate <= 1),
+    with "poisson" any number can arrive in the same minute.
+    """
+
+    def __init__(
+        self,
+        name="default",
+        total_minutes=480,
+        arrival_rate=0.3,
+        arrival_process="bernoulli",
+        type_weights=None,
+        num_workers=1,
+        worker_capacity=3,
+        max_visible_tasks=10,
+        starting_trust=100,
+        hourly_bonus=30,
+    ):
+        if arrival_process not in ("bernoulli", "poisson"):
+            raise ValueError(f"Unknown arrival process: {arrival_process}")
+        if arrival_process == "bernoulli" and not 0 <= arrival_rate <= 1:
+            raise ValueError("Bernoulli arrival rate must be between 0 and 1")
+
+        self.name = name
+        self.total_minutes = total_minutes
+        self.arrival_rate = arrival_rate
+        self.arrival_process = arrival_process
+        self.type_weights = dict(type_weights or DEFAULT_TYPE_WEIGHTS)
+        self.num_workers = num_workers
+        self.worker_capacity = worker_capacity
+        self.max_visible_tasks = max_visible_tasks
+        self.starting_trust = starting_trust
+        self.hourly_bonus = hourly_bonus
+
+    @property
+    def max_working_tasks(self):
+        # A work action reaches num_workers slots from its start slot; tasks
+        # beyond the last reachable slot could never be worked on
+        return min(self.num_workers * self.worker_capacity, self.num_workers + WORK_ACTIONS - 1)
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def __repr__(self):
+        return (
+            f"ScenarioConfig({self.name!r}, {self.total_minutes} min, "
+            f"{self.arrival_rate} tasks/min {self.arrival_process}, "
+            f"{self.num_workers}x{self.worker_capacity} workers)"
+        )
+
+
+SCENARIOS = {
+    "default": ScenarioConfig(),
+    "week": ScenarioConfig(name="week", total_minutes=5 * 480),
+    "busy": ScenarioConfig(name="busy", arrival_rate=0.6, num_workers=2),
+    "team": ScenarioConfig(
+        name="team",
+        total_minutes=5 * 480,
+        arrival_rate=1.5,
+        arrival_process="poisson",
+        num_workers=5,
+    ),
+    "high_load": ScenarioConfig(
+        name="high_load",
+        total_minutes=5 * 480,
+        arrival_rate=4.0,
+        arrival_process="poisson",
+        type_weights={"high": 0.1, "medium": 0.3, "basic": 0.6},
+        num_workers=10,
+        max_visible_tasks=50,
+    ),
+}
+
+
+def get_scenario(name):
+    if name not in SCENARIOS:
+        raise ValueError(f"Unknown scenario {name!r}, choose from {sorted(SCENARIOS)}")
+    return SCENARIOS[name]
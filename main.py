@@ -115,11 +115,7 @@ def run_visual_demo():
 
 
 def play_trained_agents():
-    import os
-    from stable_baselines3 import PPO, DQN
-    import torch
-    from training.pg_training import PolicyGradient
-    from environment.rendering import GameVisualization
+    from serving.model_registry import ModelRegistry
 
     print("Playing Trained Agents")
     print("=" * 40)
@@ -127,35 +123,22 @@ def play_trained_agents():
     env = WorkplaceEnv()
     viz = GameVisualization(env)
 
-
-    models_available = []
-    if os.path.exists("models/ppo_workplace_agent.zip"):
-        models_available.append("PPO")
-    if os.path.exists("models/dqn_workplace_agent.zip"):
-        models_available.append("DQN")
-    if os.path.exists("models/pg_workplace_agent.pth"):
-        models_available.append("Policy Gradient")
+    registry = ModelRegistry("models")
+    models_available = registry.available()
 
     if not models_available:
         print("No trained models found. Please run training first (option 2).")
         return
 
-    print(f"Available trained models: {', '.join(models_available)}")
+    print(f"Available trained models: {', '.join(info.display_name for info in models_available)}")
 
-    for agent_name in models_available:
+    for model_info in models_available:
+        agent_name = model_info.display_name
         print(f"\nPlaying {agent_name} Agent...")
         print("Press Ctrl+C to skip to next agent or quit")
 
         try:
-            if agent_name == "PPO":
-                model = PPO.load("models/ppo_workplace_agent")
-            elif agent_name == "DQN":
-                model = DQN.load("models/dqn_workplace_agent")
-            elif agent_name == "Policy Gradient":
-                checkpoint = torch.load("models/pg_workplace_agent.pth", weights_only=False)
-                model = PolicyGradient(checkpoint['state_dim'], checkpoint['action_dim'])
-                model.network.load_state_dict(checkpoint['model_state_dict'])
-                model.optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
+            model = registry.get(model_info.name)
             obs, _ = env.reset()
             total_reward = 0
             clock = pygame.time.Clock()
@@ -182,10 +165,7 @@ def play_trained_agents():
                 if not running:
                     break
 
-                if agent_name in ["PPO", "DQN"]:
-                    action, _ = model.predict(obs, deterministic=True)
-                else:  # Policy Gradient
-                    action = model.select_action(obs)
+                action = model.act(obs)
 
                 obs, reward, done, _, info = env.step(action)
                 total_reward += reward
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import argparse
+import os
 import time
 import json
 import matplotlib.pyplot as plt
@@ -7,10 +9,12 @@ import numpy as np
 
 from environment.custom_env import WorkplaceEnv
 from training.dqn_training import train_agents
+from training.evaluation import print_paired_comparisons
+from training.oracle import label_bank, regret
 
 
-def analyze_results(results):
-    """Analyze and visualize results"""
+def analyze_results(results, oracle_returns=None, seed_summary=None, total_minutes=480, plot_path="training_results.png"):
+    """Analyze and visualize results; an episode survives when it lasts total_minutes"""
     print("  Creating visualizations...")
     fig, axes = plt.subplots(2, 2, figsize=(15, 10))
 
@@ -24,11 +28,11 @@ def analyze_results(results):
 
 
     survival_rates = {
-        agent: np.mean([1 if t >= 480 else 0 for t in data["survival_times"]])
+        agent: np.mean([1 if t >= total_minutes else 0 for t in data["survival_times"]])
         for agent, data in results.items()
     }
     axes[0, 1].bar(survival_rates.keys(), survival_rates.values())
-    axes[0, 1].set_title("Survival Rate (Complete 8 hours)")
+    axes[0, 1].set_title(f"Survival Rate (Complete {total_minutes / 60:g} hours)")
     axes[0, 1].set_ylabel("Success Rate")
 
 
@@ -49,8 +53,9 @@ def analyze_results(results):
     axes[1, 1].set_ylabel("Trust Points")
 
     plt.tight_layout()
-    plt.savefig('training_results.png', dpi=300, bbox_inches='tight')
-    print("  ✓ Results plot saved as 'training_results.png'")
+    plt.savefig(plot_path, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    print(f"  ✓ Results plot saved as '{plot_path}'")
 
     # Print detailed analysis
     print("  ✓ Generating performance analysis...")
@@ -66,8 +71,65 @@ def analyze_results(results):
         )
         print(f"  Average Final Trust: {avg_trust[agent_name]:.1f} points")
 
+    if all(data.get("scenarios") is not None for data in results.values()):
+        print("\n=== PAIRED COMPARISON (same scenarios) ===")
+        print_paired_comparisons(results)
+
+    if oracle_returns is not None:
+        print("\n=== REGRET AGAINST THE HINDSIGHT ORACLE ===")
+        print(f"  Oracle average reward: {np.mean(oracle_returns):.2f}")
+        for agent_name, data in results.items():
+            agent_regret = regret(data, oracle_returns)
+            print(
+                f"  {agent_name.upper()}: {agent_regret.mean():.2f} average regret "
+                f"(median {np.median(agent_regret):.2f}, worst {agent_regret.max():.2f})"
+            )
+
+    if seed_summary is not None:
+        print("\n=== ACROSS SEEDS (95% CI of the per-seed means) ===")
+        for agent_name, summary in seed_summary.items():
+            print(
+                f"  {agent_name.upper()} over {len(summary['seeds'])} seeds: "
+                f"reward {summary['mean_reward']:.2f} "
+                f"({summary['reward_ci'][0]:.2f} to {summary['reward_ci'][1]:.2f}), "
+                f"survival {summary['survival_rate']:.2%} "
+                f"({summary['survival_ci'][0]:.2%} to {summary['survival_ci'][1]:.2%})"
+            )
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Train and compare the workplace agents")
+    parser.add_argument(
+        "--event-driven",
+        action="store_true",
+        help="let the wait action skip straight to the next event",
+    )
+    parser.add_argument(
+        "--lean",
+        action="store_true",
+        help="reuse observation buffers, skip per-step info dicts and keep only task totals",
+    )
+    parser.add_argument(
+        "--scenario-bank",
+        help="directory of a scenario bank; all agents are tested on the same scenarios",
+    )
+    parser.add_argument(
+        "--finetune",
+        action="store_true",
+        help="continue from the saved models with a reduced budget and early stopping instead of training from scratch",
+    )
+    parser.add_argument(
+        "--out",
+        metavar="DIR",
+        help="with --finetune, directory for the fine-tuned models (default: models/finetuned); models/ is left as is",
+    )
+    parser.add_argument(
+        "--telemetry",
+        metavar="NAME",
+        help="publish per-episode telemetry under NAME for python -m training.monitor --run NAME",
+    )
+    args = parser.parse_args()
+
     print("Workplace Agent Training")
     print("=" * 40)
     print("Training agents... This may take a few minutes.")
@@ -75,7 +137,30 @@ def main():
     start_time = time.time()
 
     try:
-        results = train_agents()
+        scenario_bank = None
+        if args.scenario_bank:
+            from environment.scenario_bank import ScenarioBank
+            scenario_bank = ScenarioBank(args.scenario_bank)
+            print(f"Testing on {scenario_bank}")
+
+        telemetry = None
+        if args.telemetry:
+            from training.telemetry import TelemetryBuffer
+            telemetry = TelemetryBuffer.create(args.telemetry, slots=3)
+            print(f"Publishing telemetry as {args.telemetry!r}")
+
+        try:
+            results = train_agents(
+                event_driven=args.event_driven,
+                lean=args.lean,
+                scenario_bank=scenario_bank,
+                finetune=args.finetune,
+                telemetry=telemetry,
+                finetune_dir=args.out,
+            )
+        finally:
+            if telemetry is not None:
+                telemetry.close()
 
         end_time = time.time()
         training_time = end_time - start_time
@@ -92,8 +177,17 @@ def main():
             json.dump(results_with_metadata, f, indent=2)
         print("  results saved to training_results.json")
 
+        oracle_returns = None
+        if scenario_bank is not None and scenario_bank.config.num_workers == 1:
+            print("\nComputing hindsight-optimal returns for the test scenarios...")
+            oracle_returns = label_bank(
+                scenario_bank,
+                results["ppo"]["scenarios"],
+                workers=os.cpu_count(),
+            )
+
         print("\nAnalyzing results...")
-        analyze_results(results)
+        analyze_results(results, oracle_returns)
 
     except Exception as e:
         print(f"Training failed with error: {e}")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from serving.lookup_table import LookupTablePolicy
+from serving.quantize import run_episodes
+
+
+# Observation features: time, trust, active count, available count, urgency
+DEFAULT_GRID = {
+    "time_bins": 24,
+    "trust_bins": 32,
+    "trust_max": 4.0,
+    "urgency_bins": 10,
+}
+
+
+def bin_centers(bins, high=1.0):
+    return (np.arange(bins) + 0.5) * high / bins
+
+
+def grid_points(grid, max_active, max_available):
+    """Observations at the center of every cell, in table order"""
+    axes = [
+        bin_centers(grid["time_bins"]),
+        bin_centers(grid["trust_bins"], grid["trust_max"]),
+        np.arange(max_active + 1),
+        np.arange(max_available + 1),
+        bin_centers(grid["urgency_bins"]),
+    ]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return np.stack([m.ravel() for m in mesh], axis=1).astype(np.float32), [len(a) for a in axes]
+
+
+def batched_act(act, obs, batch_size=65536):
+    return np.concatenate([act(obs[i:i + batch_size]) for i in range(0, len(obs), batch_size)])
+
+
+def tabulate(policy, grid, max_active, max_available):
+    points, shape = grid_points(grid, max_active, max_available)
+    return batched_act(policy.act, points).astype(np.uint8).reshape(shape)
+
+
+def impure_cells(policy, table_policy, probes=4, seed=0):
+    """Cells where the network's action differs at some random point inside the cell"""
+    rng = np.random.default_rng(seed)
+    grid = table_policy.grid
+    points, shape = grid_points(grid, *(np.array(table_policy.table.shape[2:4]) - 1))
+    widths = np.array([1 / grid["time_bins"], grid["trust_max"] / grid["trust_bins"], 0, 0, 1 / grid["urgency_bins"]])
+
+    impure = np.zeros(len(points), dtype=bool)
+    expected = table_policy.table.ravel()
+    for _ in range(probes):
+        jitter = (rng.random(points.shape) - 0.5) * widths
+        impure |= batched_act(policy.act, (points + jitter).astype(np.float32)) != expected
+    return impure.reshape(shape)
+
+
+def compare(policy, table_policy, episodes=50, seed=0):
+    """Agreement, estimated disagreement, reward and latency of a table against the network it was distilled from.
+
+    estimated_disagreement is the share of visited states that fall in a
+    cell where a few random probes found the network disagreeing with the
+    table; probes can miss disagreements, so it is an estimate, not a bound.
+    """
+    seeds = range(seed, seed + episodes)
+    network_rewards, visited = run_episodes(policy.act, seeds)
+    table_rewards, _ = run_episodes(table_policy.act, seeds)
+
+    agreement = float(np.mean(batched_act(policy.act, visited) == table_policy.act(visited)))
+    impure = impure_cells(policy, table_policy)
+    visited_impure = float(np.mean(impure[tuple(table_policy.cells(visited).T)]))
+
+    single = visited[0]
+    return {
+        "agreement": agreement,
+        "impure_cells": float(impure.mean()),
+        "estimated_disagreement": visited_impure,
+        "network_reward": float(network_rewards.mean()),
+        "table_reward": float(table_rewards.mean()),
+        "reward_change": float((table_rewards - network_rewards).mean()),
+        "network_latency_us": median_latency_us(policy.act, single),
+        "table_latency_us": median_latency_us(table_policy.act, single),
+    }
+
+
+def median_latency_us(act, obs, repeats=1000):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        act(obs)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill saved policies into lookup tables over a quantized observation grid")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--episodes", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-bins", type=int, default=DEFAULT_GRID["time_bins"])
+    parser.add_argument("--trust-bins", type=int, default=DEFAULT_GRID["trust_bins"])
+    parser.add_argument("--trust-max", type=float, default=DEFAULT_GRID["trust_max"])
+    parser.add_argument("--urgency-bins", type=int, default=DEFAULT_GRID["urgency_bins"])
+    parser.add_argument("--threshold", type=float, default=0.99, help="minimum action agreement to save the table")
+    args = parser.parse_args()
+
+    import torch
+
+    from environment.custom_env import WorkplaceEnv
+    from serving.model_registry import ModelInfo, ModelRegistry
+
+    torch.set_num_threads(1)
+    env = WorkplaceEnv()
+    grid = {
+        "time_bins": args.time_bins,
+        "trust_bins": args.trust_bins,
+        "trust_max": args.trust_max,
+        "urgency_bins": args.urgency_bins,
+    }
+    registry = ModelRegistry(args.models_dir)
+
+    for info in registry.available():
+        if info.variant != "fp32":
+            continue
+
+        print(f"\n{info.display_name} ({info.name})")
+        policy = registry.get(info.name)
+        table = tabulate(policy, grid, env.MAX_WORKING_TASKS, env.MAX_VISIBLE_TASKS)
+        table_info = ModelInfo(
+            f"{info.name}_table", None, info.algorithm, info.obs_dim, info.action_dim,
+            info.training_steps, "", variant="table",
+        )
+        table_policy = LookupTablePolicy(table_info, table, grid)
+        report = compare(policy, table_policy, args.episodes, args.seed)
+
+        print(f"  Table: {table.shape} cells, {table.nbytes / 1024:.1f} KiB")
+        print(f"  Action agreement on visited states: {report['agreement']:.2%}")
+        print(
+            f"  Cells whose action changes inside the cell: {report['impure_cells']:.2%} of all, "
+            f"{report['estimated_disagreement']:.2%} of visited states (estimated disagreement)"
+        )
+        print(
+            f"  Episode reward: {report['network_reward']:.2f} network -> {report['table_reward']:.2f} table "
+            f"({report['reward_change']:+.2f} paired)"
+        )
+        print(f"  Latency: {report['network_latency_us']:.1f} us -> {report['table_latency_us']:.2f} us")
+
+        if report["agreement"] < args.threshold:
+            print(f"  Agreement below {args.threshold:.2%}, not saving")
+            continue
+
+        path = os.path.join(args.models_dir, f"{info.name}_table.npz")
+        table_policy.save(path, {
+            "algorithm": info.algorithm,
+            "obs_dim": info.obs_dim,
+            "action_dim": info.action_dim,
+            "training_steps": info.training_steps,
+            "source_sha256": info.sha256,
+            **report,
+        })
+        print(f"  Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+from collections import deque
+
+import numpy as np
+
+from serving.model_registry import ModelRegistry
+
+
+class BatchingInferenceServer:
+    """Serves greedy actions over newline-delimited JSON.
+
+    Requests look like {"id": 7, "obs": [...]} and are answered with
+    {"id": 7, "action": 2}; {"op": "stats"} returns latency statistics.
+    Requests arriving within max_latency_ms of the first queued one are
+    answered by a single batched forward pass of up to max_batch_size rows.
+    Malformed requests get {"id": 7, "error": "..."} and never reach a batch.
+    """
+
+    def __init__(self, act, obs_dim, max_batch_size=64, max_latency_ms=2.0, stats_window=10000):
+        self.act = act
+        self.obs_dim = obs_dim
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.latencies = deque(maxlen=stats_window)
+        self.batch_sizes = deque(maxlen=stats_window)
+        self.requests_served = 0
+        self._queue = None
+
+    def stats(self):
+        latencies_ms = np.array(self.latencies) * 1000
+        return {
+            "requests": self.requests_served,
+            "p50_ms": float(np.percentile(latencies_ms, 50)) if len(latencies_ms) else 0.0,
+            "p99_ms": float(np.percentile(latencies_ms, 99)) if len(latencies_ms) else 0.0,
+            "mean_batch_size": float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0,
+        }
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0][1] + self.max_latency
+
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                actions = self.act(np.stack([request[0] for request in batch]))
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            now = loop.time()
+            for (_, arrival, future), action in zip(batch, actions):
+                self.latencies.append(now - arrival)
+                future.set_result(int(action))
+            self.batch_sizes.append(len(batch))
+            self.requests_served += len(batch)
+
+    async def _answer(self, request, writer):
+        loop = asyncio.get_running_loop()
+        if not isinstance(request, dict):
+            response = {"error": "request must be a JSON object"}
+        elif request.get("op") == "stats":
+            response = self.stats()
+        else:
+            try:
+                if "obs" not in request:
+                    raise ValueError("request has no obs")
+                obs = np.asarray(request["obs"], dtype=np.float32)
+                if obs.shape != (self.obs_dim,):
+                    raise ValueError(f"obs must have shape ({self.obs_dim},), got {obs.shape}")
+                future = loop.create_future()
+                await self._queue.put((obs, loop.time(), future))
+                response = {"id": request.get("id"), "action": await future}
+            except Exception as e:
+                response = {"id": request.get("id"), "error": str(e)}
+        writer.write((json.dumps(response) + "\n").encode())
+
+    async def handle_client(self, reader, writer):
+        pending = set()
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    writer.write((json.dumps({"error": f"invalid JSON: {e}"}) + "\n").encode())
+                    continue
+                task = asyncio.create_task(self._answer(request, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+            await writer.drain()
+        except ConnectionResetError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None):
+        self._queue = asyncio.Queue()
+        batcher = asyncio.create_task(self._batch_loop())
+
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+            print(f"Serving on {unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            print(f"Serving on {host}:{port}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching policy inference server")
+    parser.add_argument("--agent", default="ppo", help="model name or algorithm (ppo, dqn, pg)")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="serve on this Unix socket path instead of TCP")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    import torch
+
+    torch.set_num_threads(1)
+    policy = ModelRegistry(args.models_dir).get(args.agent)
+    server = BatchingInferenceServer(policy.act, policy.info.obs_dim, args.max_batch_size, args.max_latency_ms)
+
+    print(f"Loaded {policy.info.display_name} model {policy.info.name} (batch <= {args.max_batch_size}, wait <= {args.max_latency_ms} ms)")
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print(f"\nStopped. {json.dumps(server.stats())}")
+
+
+if __name__ == "__main__":
+    main()
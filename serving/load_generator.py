@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from environment.custom_env import WorkplaceEnv
+
+
+async def run_workplace(connect, episodes, seed, latencies):
+    """Play episodes in one simulated workplace, asking the server for every action"""
+    reader, writer = await connect()
+    env = WorkplaceEnv()
+    obs, _ = env.reset(seed=seed)
+    rewards = []
+    total_reward = 0
+    request_id = 0
+
+    while len(rewards) < episodes:
+        start = time.perf_counter()
+        writer.write((json.dumps({"id": request_id, "obs": obs.tolist()}) + "\n").encode())
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        request_id += 1
+
+        obs, reward, done, _, _ = env.step(response["action"])
+        total_reward += reward
+        if done:
+            rewards.append(total_reward)
+            total_reward = 0
+            obs, _ = env.reset()
+
+    writer.close()
+    return rewards
+
+
+async def fetch_stats(connect):
+    reader, writer = await connect()
+    writer.write(b'{"op": "stats"}\n')
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return stats
+
+
+async def run_load(connect, workplaces, episodes):
+    latencies = []
+    start = time.perf_counter()
+    rewards = await asyncio.gather(*[
+        run_workplace(connect, episodes, seed, latencies) for seed in range(workplaces)
+    ])
+    elapsed = time.perf_counter() - start
+    return rewards, latencies, elapsed, await fetch_stats(connect)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the inference server with many concurrent workplaces")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="connect to this Unix socket instead of TCP")
+    parser.add_argument("--workplaces", type=int, default=64)
+    parser.add_argument("--episodes", type=int, default=1, help="episodes per workplace")
+    args = parser.parse_args()
+
+    if args.unix:
+        connect = lambda: asyncio.open_unix_connection(args.unix)
+    else:
+        connect = lambda: asyncio.open_connection(args.host, args.port)
+
+    print(f"Running {args.workplaces} workplaces x {args.episodes} episodes...")
+    rewards, latencies, elapsed, server_stats = asyncio.run(
+        run_load(connect, args.workplaces, args.episodes)
+    )
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"  Decisions: {len(latencies):,} in {elapsed:.1f} seconds ({len(latencies) / elapsed:,.0f}/s)")
+    print(f"  Client latency: p50 {np.percentile(latencies_ms, 50):.2f} ms, p99 {np.percentile(latencies_ms, 99):.2f} ms")
+    print(f"  Server latency: p50 {server_stats['p50_ms']:.2f} ms, p99 {server_stats['p99_ms']:.2f} ms")
+    print(f"  Mean batch size: {server_stats['mean_batch_size']:.1f}")
+    print(f"  Average episode reward: {np.mean([r for rs in rewards for r in rs]):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+
+
+class LookupTablePolicy:
+    """Greedy policy read from a table over a quantized observation grid.
+
+    Time, trust and urgency are cut into equal-width bins (trust clipped to
+    trust_max), the active and available counts are used as they are. act()
+    on a single observation is a few integer operations and one bytes lookup;
+    nothing but numpy is needed to load it.
+    """
+
+    def __init__(self, info, table, grid):
+        self.info = info
+        self.table = np.ascontiguousarray(table, dtype=np.uint8)
+        self.grid = dict(grid)
+        self._flat = self.table.tobytes()
+        self._strides = [stride // self.table.itemsize for stride in self.table.strides]
+        self._time_bins = grid["time_bins"]
+        self._trust_max = grid["trust_max"]
+        self._trust_bins = grid["trust_bins"]
+        self._urgency_bins = grid["urgency_bins"]
+        self._max_active = self.table.shape[2] - 1
+        self._max_available = self.table.shape[3] - 1
+
+    @staticmethod
+    def _bin(value, bins):
+        index = int(value * bins)
+        return 0 if index < 0 else bins - 1 if index >= bins else index
+
+    def cell(self, obs):
+        return (
+            self._bin(obs[0], self._time_bins),
+            self._bin(obs[1] / self._trust_max, self._trust_bins),
+            min(max(int(obs[2]), 0), self._max_active),
+            min(max(int(obs[3]), 0), self._max_available),
+            self._bin(obs[4], self._urgency_bins),
+        )
+
+    def cells(self, obs):
+        obs = np.asarray(obs, dtype=np.float64).reshape(-1, 5)
+        limits = np.array(self.table.shape) - 1
+        scaled = obs * [self._time_bins, self._trust_bins / self._trust_max, 1, 1, self._urgency_bins]
+        return np.clip(np.floor(scaled).astype(np.int64), 0, limits)
+
+    def act(self, obs):
+        if len(obs) == 5 and np.ndim(obs) == 1:
+            s = self._strides
+            t, trust, active, available, urgency = self.cell(obs)
+            return self._flat[t * s[0] + trust * s[1] + active * s[2] + available * s[3] + urgency * s[4]]
+        return self.table[tuple(self.cells(obs).T)].astype(np.int64)
+
+    def warmup(self):
+        self.act(np.zeros(5, dtype=np.float32))
+
+    def save(self, path, meta):
+        np.savez_compressed(
+            path,
+            table=self.table,
+            grid=json.dumps(self.grid),
+            meta=json.dumps(meta),
+        )
+
+    @staticmethod
+    def read(path):
+        with np.load(path) as data:
+            return data["table"], json.loads(str(data["grid"])), json.loads(str(data["meta"]))
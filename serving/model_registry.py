@@ -0,0 +1,310 @@
+import hashlib
+import json
+import os
+import zipfile
+from collections import OrderedDict
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+
+ALGORITHM_NAMES = {
+    "ppo": "PPO",
+    "dqn": "DQN",
+    "pg": "Policy Gradient",
+}
+
+# Checkpoints written before PolicyGradient.save stored plain ints keep
+# their dims as numpy scalars
+NUMPY_SAFE_GLOBALS = [
+    np.int64(0).__reduce__()[0],
+    np.dtype,
+    type(np.dtype(np.int64)),
+]
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelInfo:
+    def __init__(self, name, path, algorithm, obs_dim, action_dim, training_steps, sha256, variant="fp32"):
+        self.name = name
+        self.path = path
+        self.algorithm = algorithm
+        self.obs_dim = obs_dim
+        self.action_dim = action_dim
+        self.training_steps = training_steps
+        self.sha256 = sha256
+        self.variant = variant
+
+    @property
+    def display_name(self):
+        name = ALGORITHM_NAMES.get(self.algorithm, self.algorithm.upper())
+        return name if self.variant == "fp32" else f"{name} ({self.variant})"
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+    def __repr__(self):
+        steps = f"{self.training_steps:,} steps" if self.training_steps is not None else "unknown steps"
+        return (
+            f"ModelInfo({self.name!r}, {self.algorithm}, "
+            f"{self.obs_dim}->{self.action_dim}, {self.variant}, {steps}, {self.sha256[:12]})"
+        )
+
+
+class LoadedPolicy:
+    """Greedy inference wrapper around a module mapping observations to action scores"""
+
+    def __init__(self, info, module):
+        self.info = info
+        self.module = module.eval()
+
+    def act(self, obs):
+        obs = np.asarray(obs, dtype=np.float32)
+        single = obs.ndim == 1
+        with torch.no_grad():
+            scores = self.module(torch.as_tensor(obs.reshape(-1, self.info.obs_dim)))
+        actions = scores.argmax(dim=1).numpy()
+        return int(actions[0]) if single else actions
+
+    def warmup(self):
+        self.act(np.zeros((1, self.info.obs_dim), dtype=np.float32))
+
+
+def _read_sb3_info(name, path):
+    with zipfile.ZipFile(path) as archive:
+        data = json.loads(archive.read("data"))
+
+    policy_module = data["policy_class"].get("__module__", "")
+    algorithm = "dqn" if "dqn" in policy_module else "ppo"
+    return ModelInfo(
+        name,
+        path,
+        algorithm,
+        int(np.prod(data["observation_space"]["_shape"])),
+        int(data["action_space"]["n"]),
+        int(data["num_timesteps"]),
+        file_sha256(path),
+    )
+
+
+def _read_pg_info(name, path):
+    checkpoint = _load_pg_checkpoint(path)
+    return ModelInfo(
+        name,
+        path,
+        "pg",
+        int(checkpoint["state_dim"]),
+        int(checkpoint["action_dim"]),
+        checkpoint.get("timesteps"),
+        file_sha256(path),
+    )
+
+
+def _read_quantized_info(name, path):
+    meta = torch.load(path, map_location="cpu", weights_only=True)["meta"]
+    return ModelInfo(
+        name,
+        path,
+        meta["algorithm"],
+        meta["obs_dim"],
+        meta["action_dim"],
+        meta["training_steps"],
+        file_sha256(path),
+        variant="int8",
+    )
+
+
+def _read_table_info(name, path):
+    from serving.lookup_table import LookupTablePolicy
+
+    _, _, meta = LookupTablePolicy.read(path)
+    return ModelInfo(
+        name,
+        path,
+        meta["algorithm"],
+        meta["obs_dim"],
+        meta["action_dim"],
+        meta["training_steps"],
+        file_sha256(path),
+        variant="table",
+    )
+
+
+def _load_pg_checkpoint(path):
+    with torch.serialization.safe_globals(NUMPY_SAFE_GLOBALS):
+        return torch.load(path, map_location="cpu", weights_only=True)
+
+
+def _no_schedule(_):
+    return 0.0
+
+
+def _load_sb3_zip(path):
+    from stable_baselines3.common.save_util import load_from_zip_file
+
+    # Schedules are only needed for training and may not unpickle across
+    # Python versions, so replace them instead of deserializing
+    data, params, _ = load_from_zip_file(
+        path,
+        device="cpu",
+        custom_objects={
+            "lr_schedule": _no_schedule,
+            "clip_range": _no_schedule,
+            "exploration_schedule": _no_schedule,
+        },
+    )
+    return data, params
+
+
+def _load_sb3_params(path):
+    """Policy state dict of an SB3 zip, without rebuilding the policy"""
+    return _load_sb3_zip(path)[1]["policy"]
+
+
+def _load_sb3_module(info):
+    data, params = _load_sb3_zip(info.path)
+    policy = data["policy_class"](
+        data["observation_space"],
+        data["action_space"],
+        _no_schedule,
+        **data["policy_kwargs"],
+    )
+    policy.load_state_dict(params["policy"])
+    policy.set_training_mode(False)
+
+    if info.algorithm == "dqn":
+        return policy.q_net
+    return nn.Sequential(
+        policy.pi_features_extractor,
+        policy.mlp_extractor.policy_net,
+        policy.action_net,
+    )
+
+
+def _load_pg_module(info):
+    from training.pg_training import build_policy_network
+
+    checkpoint = _load_pg_checkpoint(info.path)
+    network = build_policy_network(info.obs_dim, info.action_dim)
+    network.load_state_dict(checkpoint["model_state_dict"])
+    return network
+
+
+def _load_quantized_module(info):
+    from serving.quantize import import_layers
+
+    return import_layers(torch.load(info.path, map_location="cpu", weights_only=True)["layers"])
+
+
+def _load_table_policy(info):
+    from serving.lookup_table import LookupTablePolicy
+
+    table, grid, _ = LookupTablePolicy.read(info.path)
+    return LookupTablePolicy(info, table, grid)
+
+
+class ModelRegistry:
+    """Index of the trained policies in a models directory.
+
+    Metadata is read once per artifact (and again only when the file
+    changes). Policies are loaded for inference on first use, warmed up
+    with one forward pass and kept in an LRU cache of max_loaded entries.
+    """
+
+    READERS = {
+        ".zip": _read_sb3_info,
+        ".pth": _read_pg_info,
+        ".pt": _read_quantized_info,
+        ".npz": _read_table_info,
+    }
+
+    # fp32 artifacts load by algorithm, other variants by variant. Loaders
+    # return a torch module scoring actions, or a ready policy with act()
+    LOADERS = {
+        "ppo": _load_sb3_module,
+        "dqn": _load_sb3_module,
+        "pg": _load_pg_module,
+        "int8": _load_quantized_module,
+        "table": _load_table_policy,
+    }
+
+    def __init__(self, models_dir="models", max_loaded=4):
+        self.models_dir = models_dir
+        self.max_loaded = max_loaded
+        self._index = {}
+        self._stamps = {}
+        self._cache = OrderedDict()
+        self.refresh()
+
+    def refresh(self):
+        index = {}
+        if os.path.isdir(self.models_dir):
+            for filename in sorted(os.listdir(self.models_dir)):
+                name, ext = os.path.splitext(filename)
+                if ext not in self.READERS:
+                    continue
+
+                path = os.path.join(self.models_dir, filename)
+                stat = os.stat(path)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                if self._stamps.get(name) == stamp and name in self._index:
+                    index[name] = self._index[name]
+                else:
+                    try:
+                        index[name] = self.READERS[ext](name, path)
+                    except Exception as e:
+                        print(f"  skipping {filename}: {e}")
+                        continue
+                    self._cache.pop(name, None)
+                self._stamps[name] = stamp
+
+        self._index = index
+        return self.available()
+
+    def available(self):
+        order = list(ALGORITHM_NAMES)
+        return sorted(
+            self._index.values(),
+            key=lambda info: (
+                order.index(info.algorithm) if info.algorithm in order else len(order),
+                info.name,
+            ),
+        )
+
+    def info(self, name):
+        return self._index[self.resolve(name)]
+
+    def resolve(self, name):
+        """Accept an artifact name or an algorithm ("ppo", "dqn", "pg"), preferring fp32 models"""
+        if name in self._index:
+            return name
+        matches = [info for info in self.available() if info.algorithm == name]
+        for info in sorted(matches, key=lambda info: info.variant != "fp32"):
+            return info.name
+        raise KeyError(f"No model named {name!r} in {self.models_dir}")
+
+    def get(self, name):
+        name = self.resolve(name)
+        if name in self._cache:
+            self._cache.move_to_end(name)
+            return self._cache[name]
+
+        info = self._index[name]
+        loader = self.LOADERS[info.algorithm if info.variant == "fp32" else info.variant]
+        policy = loader(info)
+        if isinstance(policy, nn.Module):
+            policy = LoadedPolicy(info, policy)
+        policy.warmup()
+
+        self._cache[name] = policy
+        while len(self._cache) > self.max_loaded:
+            self._cache.popitem(last=False)
+        return policy
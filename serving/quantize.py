@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+import argparse
+import copy
+import io
+import os
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from environment.custom_env import WorkplaceEnv
+from serving.model_registry import ModelRegistry
+
+
+ACTIVATIONS = {
+    nn.ReLU: "relu",
+    nn.Tanh: "tanh",
+}
+
+ACTIVATION_MODULES = {name: module for module, name in ACTIVATIONS.items()}
+
+# Modules that do not change which action scores highest for a flat observation
+PASSTHROUGH = (nn.Sequential, nn.Flatten, nn.Softmax)
+
+
+def to_sequential(module):
+    """Flatten a policy's score network into Linear/activation layers.
+
+    Works for the PPO actor, the DQN Q-network and the PG network; the
+    trailing Softmax of the PG network is dropped since argmax ignores it.
+    """
+    layers = []
+    for child in module.modules():
+        if isinstance(child, nn.Linear):
+            layers.append(child)
+        elif type(child) in ACTIVATIONS:
+            layers.append(type(child)())
+        elif list(child.children()) or isinstance(child, PASSTHROUGH):
+            continue
+        else:
+            raise ValueError(f"Cannot quantize policies containing {type(child).__name__}")
+    return nn.Sequential(*copy.deepcopy(layers)).eval()
+
+
+def quantize_module(module):
+    return torch.ao.quantization.quantize_dynamic(
+        to_sequential(module), {nn.Linear}, dtype=torch.qint8
+    )
+
+
+def export_layers(quantized):
+    """Plain tensors and numbers describing a dynamically quantized Sequential"""
+    layers = []
+    for layer in quantized:
+        if type(layer) in ACTIVATIONS:
+            layers.append({"type": ACTIVATIONS[type(layer)]})
+            continue
+
+        weight = layer.weight()
+        layers.append({
+            "type": "linear",
+            "weight": weight.int_repr(),
+            "scale": float(weight.q_scale()),
+            "zero_point": int(weight.q_zero_point()),
+            "bias": layer.bias().detach().clone(),
+        })
+    return layers
+
+
+def import_layers(layers):
+    """Rebuild the quantized Sequential from export_layers() output, bit for bit"""
+    modules = []
+    for spec in layers:
+        if spec["type"] != "linear":
+            modules.append(ACTIVATION_MODULES[spec["type"]]())
+            continue
+
+        out_features, in_features = spec["weight"].shape
+        linear = torch.ao.nn.quantized.dynamic.Linear(in_features, out_features, dtype=torch.qint8)
+        weight = torch._make_per_tensor_quantized_tensor(spec["weight"], spec["scale"], spec["zero_point"])
+        linear.set_weight_bias(weight, spec["bias"])
+        modules.append(linear)
+
+    return nn.Sequential(*modules).eval()
+
+
+def serialized_size(obj):
+    buffer = io.BytesIO()
+    torch.save(obj, buffer)
+    return buffer.tell()
+
+
+def greedy(module):
+    def act(obs):
+        with torch.no_grad():
+            return module(torch.as_tensor(obs, dtype=torch.float32).reshape(1, -1)).argmax(dim=1).item()
+    return act
+
+
+def run_episodes(act, seeds):
+    """Greedy episodes on fixed seeds; returns (episode rewards, visited observations)"""
+    env = WorkplaceEnv()
+    rewards = []
+    observations = []
+
+    for seed in seeds:
+        obs, _ = env.reset(seed=seed)
+        total_reward = 0
+        done = False
+        while not done:
+            observations.append(obs)
+            obs, reward, done, _, _ = env.step(act(obs))
+            total_reward += reward
+        rewards.append(total_reward)
+
+    return np.array(rewards), np.array(observations, dtype=np.float32)
+
+
+def median_latency_us(module, batch, repeats=200):
+    timings = []
+    with torch.no_grad():
+        for _ in range(repeats):
+            start = time.perf_counter()
+            module(batch)
+            timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1e6
+
+
+def compare(fp32, int8, episodes=50, seed=0):
+    """Agreement, reward, latency and size of an int8 policy against its fp32 original"""
+    seeds = range(seed, seed + episodes)
+    fp32_rewards, visited = run_episodes(greedy(fp32), seeds)
+    int8_rewards, _ = run_episodes(greedy(int8), seeds)
+
+    with torch.no_grad():
+        visited = torch.as_tensor(visited)
+        agreement = (fp32(visited).argmax(dim=1) == int8(visited).argmax(dim=1)).float().mean().item()
+
+    single = visited[:1]
+    batch = visited[:256]
+    return {
+        "agreement": agreement,
+        "fp32_reward": float(fp32_rewards.mean()),
+        "int8_reward": float(int8_rewards.mean()),
+        "reward_change": float((int8_rewards - fp32_rewards).mean()),
+        "fp32_latency_us": median_latency_us(fp32, single),
+        "int8_latency_us": median_latency_us(int8, single),
+        "fp32_batch_latency_us": median_latency_us(fp32, batch),
+        "int8_batch_latency_us": median_latency_us(int8, batch),
+        "fp32_bytes": serialized_size(to_sequential(fp32).state_dict()),
+        "int8_bytes": serialized_size(export_layers(int8)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build int8 dynamically quantized variants of the saved policies")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--episodes", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threshold", type=float, default=0.99, help="minimum argmax agreement to save the int8 model")
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)
+    registry = ModelRegistry(args.models_dir)
+
+    for info in registry.available():
+        if info.variant != "fp32":
+            continue
+
+        print(f"\n{info.display_name} ({info.name})")
+        fp32 = to_sequential(registry.get(info.name).module)
+        # Score the module exactly as the registry will rebuild it from disk
+        layers = export_layers(quantize_module(fp32))
+        int8 = import_layers(layers)
+        report = compare(fp32, int8, args.episodes, args.seed)
+
+        print(f"  Action agreement: {report['agreement']:.2%}")
+        print(
+            f"  Episode reward: {report['fp32_reward']:.2f} fp32 -> {report['int8_reward']:.2f} int8 "
+            f"({report['reward_change']:+.2f} paired)"
+        )
+        print(
+            f"  Latency (batch 1): {report['fp32_latency_us']:.0f} us -> {report['int8_latency_us']:.0f} us, "
+            f"(batch 256): {report['fp32_batch_latency_us']:.0f} us -> {report['int8_batch_latency_us']:.0f} us"
+        )
+        print(f"  Size: {report['fp32_bytes'] / 1024:.1f} KiB -> {report['int8_bytes'] / 1024:.1f} KiB")
+
+        if report["agreement"] < args.threshold:
+            print(f"  Agreement below {args.threshold:.2%}, not saving")
+            continue
+
+        path = os.path.join(args.models_dir, f"{info.name}_int8.pt")
+        torch.save({
+            "meta": {
+                "algorithm": info.algorithm,
+                "obs_dim": info.obs_dim,
+                "action_dim": info.action_dim,
+                "training_steps": info.training_steps,
+                "source_sha256": info.sha256,
+                "agreement": report["agreement"],
+            },
+            "layers": layers,
+        }, path)
+        print(f"  Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,32 @@
 import time
-from stable_baselines3 import DQN, PPO
+import torch
+from stable_baselines3 import PPO
 from stable_baselines3.common.vec_env import DummyVecEnv
 from stable_baselines3.common.callbacks import BaseCallback
 
 from environment.custom_env import WorkplaceEnv
+from training.evaluation import evaluate_policy
 from training.pg_training import PolicyGradient
+from training.prioritized_replay import PrioritizedDQN
+
+
+PPO_PARAMS = {
+    "learning_rate": 0.0001,
+    "n_steps": 4096,
+    "batch_size": 256,
+}
+
+DQN_PARAMS = {
+    "learning_rate": 0.0003,
+    "buffer_size": 100000,
+    "exploration_fraction": 0.4,
+    "alpha": 0.6,
+    "beta": 0.4,
+}
+
+PG_PARAMS = {
+    "lr": 0.002,
+}
 
 
 class ProgressCallback(BaseCallback):
@@ -24,13 +46,124 @@ class ProgressCallback(BaseCallback):
         return True
 
 
-def train_agents():
-    env = WorkplaceEnv()
+class TelemetryCallback(BaseCallback):
+    """Publishes every finished episode to a telemetry slot; nothing is shared per step"""
+
+    def __init__(self, writer, verbose=0):
+        super(TelemetryCallback, self).__init__(verbose)
+        self.writer = writer
+        self.episode_reward = 0.0
+        self.episode_steps = 0
+
+    def _on_step(self) -> bool:
+        self.episode_reward += float(self.locals["rewards"][0])
+        self.episode_steps += 1
+        if self.locals["dones"][0]:
+            info = self.locals["infos"][0]
+            self.writer.episode(
+                self.episode_reward,
+                self.episode_steps,
+                self.writer.total_minutes - info["time_left"],
+                info["trust_points"],
+            )
+            self.episode_reward = 0.0
+            self.episode_steps = 0
+        return True
+
+
+def with_telemetry(callback, telemetry, slot, label, env):
+    """callback, plus a TelemetryCallback writing to slot when a telemetry buffer is given"""
+    if telemetry is None:
+        return callback
+    return [callback, TelemetryCallback(telemetry.writer(slot, label, env.TOTAL_MINUTES))]
+
+
+def make_ppo(env, seed=None, **params):
+    vec_env = DummyVecEnv([lambda: env])
+    return PPO(
+        "MlpPolicy",
+        vec_env,
+        verbose=0,
+        device="cpu",
+        seed=seed,
+        **{**PPO_PARAMS, **params},
+    )
+
+
+def make_dqn(env, seed=None, **params):
+    return PrioritizedDQN(
+        "MlpPolicy",
+        env,
+        verbose=0,
+        device="cpu",
+        seed=seed,
+        **{**DQN_PARAMS, **params},
+    )
+
+
+def make_pg(env, **params):
+    return PolicyGradient(
+        env.observation_space.shape[0],
+        env.action_space.n,
+        **{**PG_PARAMS, **params},
+    )
+
+
+def run_pg_episode(pg_agent, env):
+    """Play one episode with the PG agent and update it; returns (reward, steps, info)"""
+    obs, _ = env.reset()
+    total_reward = 0
+    steps = 0
+    done = False
+
+    while not done:
+        action = pg_agent.select_action(obs, env.action_masks())
+        obs, reward, done, _, info = env.step(action)
+        pg_agent.rewards.append(reward)
+        total_reward += reward
+        steps += 1
+
+    pg_agent.update()
+    return total_reward, steps, info
+
+
+def evaluate_model(model, env, episodes=100, agent_name=None, scenarios=None):
+    act = lambda obs: model.predict(obs, deterministic=True)[0]
+    return evaluate_policy(act, env, episodes, agent_name, scenarios)
+
+
+def pg_greedy(pg_agent, env=None):
+    """Greedy action of the PG network, for evaluation without sampling; masked when env is given"""
+    def act(obs):
+        with torch.no_grad():
+            probs = pg_agent.network(torch.as_tensor(obs, dtype=torch.float32))
+        if env is not None:
+            probs = probs.masked_fill(~torch.as_tensor(env.action_masks()), -1.0)
+        return int(probs.argmax())
+    return act
+
+
+def train_agents(event_driven=False, lean=False, scenario_bank=None, finetune=False, telemetry=None, finetune_dir=None):
+    # Lean training also keeps only the ledger totals of finished tasks
+    env = WorkplaceEnv(
+        event_driven=event_driven,
+        lean=lean,
+        scenario_bank=scenario_bank,
+        recent_tasks=0 if lean else None,
+    )
+    # With a scenario bank every agent is tested on the same 100 scenarios
+    test_scenarios = range(min(100, len(scenario_bank))) if scenario_bank is not None else None
+
+    if finetune:
+        from training.finetune import finetune_agents
+        return finetune_agents(env, test_scenarios=test_scenarios, out_dir=finetune_dir)
 
     EPISODES = 2000
     TOTAL_TIMESTEPS = EPISODES * 480
 
     print(f"Training config: {EPISODES} episodes, {TOTAL_TIMESTEPS:,} timesteps")
+    if event_driven:
+        print("  event-driven env: waiting skips to the next arrival, deadline or hour")
 
     results = {
         "ppo": {"rewards": [], "survival_times": [], "trust_points": []},
@@ -42,20 +175,14 @@ def train_agents():
     print("  setting up model...")
     start_time = time.time()
 
-    vec_env = DummyVecEnv([lambda: env])
-    ppo_model = PPO(
-        "MlpPolicy",
-        vec_env,
-        verbose=0,
-        learning_rate=0.0001,
-        n_steps=4096,
-        batch_size=256,
-        device="cpu",
-    )
+    ppo_model = make_ppo(env)
 
     ppo_callback = ProgressCallback(TOTAL_TIMESTEPS, "PPO")
     print(f"  starting PPO training ({TOTAL_TIMESTEPS:,} timesteps)...")
-    ppo_model.learn(total_timesteps=TOTAL_TIMESTEPS, callback=ppo_callback)
+    ppo_model.learn(
+        total_timesteps=TOTAL_TIMESTEPS,
+        callback=with_telemetry(ppo_callback, telemetry, 0, "PPO", env),
+    )
 
     ppo_model.save("models/ppo_workplace_agent")
     print(f"  PPO model saved")
@@ -64,39 +191,19 @@ def train_agents():
     print(f"  PPO training done in {ppo_train_time:.1f} seconds")
 
     print("  testing PPO agent (100 episodes)...")
-    for episode in range(100):
-        obs, _ = env.reset()
-        total_reward = 0
-        done = False
-
-        while not done:
-            action, _ = ppo_model.predict(obs, deterministic=True)
-            obs, reward, done, _, info = env.step(action)
-            total_reward += reward
-
-        results["ppo"]["rewards"].append(total_reward)
-        results["ppo"]["survival_times"].append(env.current_time)
-        results["ppo"]["trust_points"].append(info["trust_points"])
-
-        if (episode + 1) % 25 == 0:
-            print(f"    PPO test episode {episode + 1}/100 done")
+    results["ppo"] = evaluate_model(ppo_model, env, 100, "PPO", test_scenarios)
 
     print("\nTraining DQN agent...")
     print("  setting up DQN model...")
     start_time = time.time()
-    dqn_model = DQN(
-        "MlpPolicy",
-        env,
-        verbose=0,
-        learning_rate=0.0003,
-        buffer_size=100000,
-        exploration_fraction=0.4,
-        device="cpu",
-    )
+    dqn_model = make_dqn(env)
 
     dqn_callback = ProgressCallback(TOTAL_TIMESTEPS, "DQN")
     print(f"  starting DQN training ({TOTAL_TIMESTEPS:,} timesteps)...")
-    dqn_model.learn(total_timesteps=TOTAL_TIMESTEPS, callback=dqn_callback)
+    dqn_model.learn(
+        total_timesteps=TOTAL_TIMESTEPS,
+        callback=with_telemetry(dqn_callback, telemetry, 1, "DQN", env),
+    )
 
     dqn_model.save("models/dqn_workplace_agent")
     print(f"  DQN model saved")
@@ -105,42 +212,18 @@ def train_agents():
     print(f"  DQN training done in {dqn_train_time:.1f} seconds")
 
     print("  testing DQN agent (100 episodes)...")
-    for episode in range(100):
-        obs, _ = env.reset()
-        total_reward = 0
-        done = False
-
-        while not done:
-            action, _ = dqn_model.predict(obs, deterministic=True)
-            obs, reward, done, _, info = env.step(action)
-            total_reward += reward
-
-        results["dqn"]["rewards"].append(total_reward)
-        results["dqn"]["survival_times"].append(env.current_time)
-        results["dqn"]["trust_points"].append(info["trust_points"])
-
-        if (episode + 1) % 25 == 0:
-            print(f"    DQN test episode {episode + 1}/100 done")
+    results["dqn"] = evaluate_model(dqn_model, env, 100, "DQN", test_scenarios)
 
     print("\nTraining Policy Gradient agent...")
     start_time = time.time()
-    pg_agent = PolicyGradient(
-        env.observation_space.shape[0], env.action_space.n, lr=0.002
-    )
+    pg_agent = make_pg(env)
+    pg_telemetry = telemetry.writer(2, "Policy Gradient", env.TOTAL_MINUTES) if telemetry is not None else None
 
     print(f"  starting Policy Gradient training ({EPISODES} episodes)...")
     for episode in range(EPISODES):
-        obs, _ = env.reset()
-        total_reward = 0
-        done = False
-
-        while not done:
-            action = pg_agent.select_action(obs)
-            obs, reward, done, _, info = env.step(action)
-            pg_agent.rewards.append(reward)
-            total_reward += reward
-
-        pg_agent.update()
+        total_reward, steps, info = run_pg_episode(pg_agent, env)
+        if pg_telemetry is not None:
+            pg_telemetry.episode(total_reward, steps, env.current_time, info["trust_points"])
 
         if (episode + 1) % 100 == 0:
             progress = ((episode + 1) / EPISODES) * 100
@@ -151,15 +234,13 @@ def train_agents():
             results["pg"]["survival_times"].append(env.current_time)
             results["pg"]["trust_points"].append(info["trust_points"])
 
-    import torch
-    torch.save({
-        'model_state_dict': pg_agent.network.state_dict(),
-        'optimizer_state_dict': pg_agent.optimizer.state_dict(),
-        'state_dim': env.observation_space.shape[0],
-        'action_dim': env.action_space.n
-    }, "models/pg_workplace_agent.pth")
+    pg_agent.save("models/pg_workplace_agent.pth")
     print(f"  Policy Gradient model saved")
 
+    if test_scenarios is not None:
+        print("  testing Policy Gradient agent on the scenario bank...")
+        results["pg"] = evaluate_policy(pg_greedy(pg_agent, env), env, agent_name="Policy Gradient", scenarios=test_scenarios)
+
     pg_train_time = time.time() - start_time
     print(f"  Policy Gradient training done in {pg_train_time:.1f} seconds")
 
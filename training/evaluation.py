@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def evaluate_policy(act, env, episodes=100, agent_name=None, scenarios=None):
+    """Run act(obs) -> action for a number of episodes.
+
+    With scenarios (a list of scenario ids of env.scenario_bank) episode i
+    replays scenario scenarios[i], so every agent evaluated on the same ids
+    sees exactly the same arrivals and results can be compared pairwise.
+    """
+    results = {"rewards": [], "survival_times": [], "trust_points": []}
+    if scenarios is not None:
+        scenarios = list(scenarios)
+        results["scenarios"] = scenarios
+        episodes = len(scenarios)
+
+    for episode in range(episodes):
+        options = {"scenario": scenarios[episode]} if scenarios is not None else None
+        obs, _ = env.reset(options=options)
+        total_reward = 0
+        done = False
+
+        while not done:
+            obs, reward, done, _, info = env.step(act(obs))
+            total_reward += reward
+
+        results["rewards"].append(total_reward)
+        results["survival_times"].append(env.current_time)
+        results["trust_points"].append(info["trust_points"])
+
+        if agent_name and (episode + 1) % 25 == 0:
+            print(f"    {agent_name} test episode {episode + 1}/{episodes} done")
+
+    return results
+
+
+def paired_comparison(a, b, key="rewards"):
+    """Mean per-scenario difference a - b with a normal-approximation 95% CI.
+
+    Both results must come from the same scenario ids; pairing removes the
+    scenario-to-scenario variance, which is usually most of the spread.
+    """
+    if a.get("scenarios") is None or a.get("scenarios") != b.get("scenarios"):
+        raise ValueError("Paired comparison needs results on identical scenarios")
+
+    diff = np.asarray(a[key], dtype=np.float64) - np.asarray(b[key], dtype=np.float64)
+    std = float(diff.std(ddof=1)) if len(diff) > 1 else 0.0
+    half_width = 1.96 * std / np.sqrt(len(diff))
+    return {
+        "mean_diff": float(diff.mean()),
+        "std_diff": std,
+        "ci_low": float(diff.mean() - half_width),
+        "ci_high": float(diff.mean() + half_width),
+        "wins": int((diff > 0).sum()),
+        "losses": int((diff < 0).sum()),
+        "n": len(diff),
+    }
+
+
+def print_paired_comparisons(results, key="rewards"):
+    names = [name for name in results if results[name].get("scenarios") is not None]
+    for i, a in enumerate(names):
+        for b in names[i + 1:]:
+            if results[a]["scenarios"] != results[b]["scenarios"]:
+                continue
+            c = paired_comparison(results[a], results[b], key)
+            print(
+                f"  {a.upper()} - {b.upper()}: {c['mean_diff']:+.2f} "
+                f"(95% CI {c['ci_low']:+.2f} to {c['ci_high']:+.2f}, "
+                f"{c['wins']}/{c['losses']} wins/losses over {c['n']} scenarios)"
+            )
+
+
+def _evaluate_registry_model(models_dir, name, bank, scenarios):
+    import torch
+
+    from environment.custom_env import WorkplaceEnv
+    from serving.model_registry import ModelRegistry
+
+    torch.set_num_threads(1)
+    policy = ModelRegistry(models_dir).get(name)
+    env = WorkplaceEnv(scenario_bank=bank)
+    return evaluate_policy(policy.act, env, scenarios=scenarios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate every saved model on the same bank scenarios")
+    parser.add_argument("--bank", default="scenarios/default")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--scenarios", type=int, default=100, help="use scenarios 0..N-1 of the bank")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    from environment.scenario_bank import ScenarioBank
+    from serving.model_registry import ModelRegistry
+
+    bank = ScenarioBank(args.bank)
+    scenarios = list(range(min(args.scenarios, len(bank))))
+    models = ModelRegistry(args.models_dir).available()
+    print(f"Evaluating {len(models)} models on {len(scenarios)} scenarios of {bank}")
+
+    # The bank pickles by path, so every worker maps the same file
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            info.name: pool.submit(_evaluate_registry_model, args.models_dir, info.name, bank, scenarios)
+            for info in models
+        }
+        results = {name: future.result() for name, future in futures.items()}
+
+    for name, result in results.items():
+        print(f"  {name}: {np.mean(result['rewards']):.2f} +/- {np.std(result['rewards']):.2f}")
+    print("\nPaired differences:")
+    print_paired_comparisons(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+
+import argparse
+import copy
+import os
+import time
+
+import numpy as np
+import torch
+from stable_baselines3.common.callbacks import BaseCallback
+
+from environment.custom_env import WorkplaceEnv
+from environment.scenarios import SCENARIOS, get_scenario
+from training.dqn_training import make_dqn, make_pg, make_ppo, pg_greedy, run_pg_episode
+from training.evaluation import evaluate_policy
+
+
+# A tenth of a full training run
+FINETUNE_TIMESTEPS = 96_000
+EVAL_INTERVAL = 9_600
+VALIDATION_SEED = 20_000
+
+# Smaller steps and little exploration: the policy is already close
+FINETUNE_PARAMS = {
+    "ppo": {"learning_rate": 0.00005},
+    "dqn": {"learning_starts": 1000, "exploration_initial_eps": 0.1, "exploration_fraction": 0.1},
+    "pg": {"lr": 0.0005},
+}
+
+# Parameter prefixes of the layers reading the observation and of those
+# scoring the actions, per algorithm
+LAYERS = {
+    "ppo": (["mlp_extractor.policy_net.0", "mlp_extractor.value_net.0"], ["action_net"]),
+    "dqn": (["q_net.q_net.0", "q_net_target.q_net.0"], ["q_net.q_net.4", "q_net_target.q_net.4"]),
+    "pg": (["0"], ["4"]),
+}
+
+
+def identity_map(old_dim, new_dim):
+    """New index i reads old index i; indices past the old size are new (-1)"""
+    return [i if i < old_dim else -1 for i in range(new_dim)]
+
+
+def _take(tensor, index_map, dim, fill):
+    index = torch.as_tensor(index_map)
+    out = tensor.index_select(dim, index.clamp(min=0)).clone()
+    out[(slice(None),) * dim + (index < 0,)] = fill
+    return out
+
+
+def remap_state(state, algorithm, obs_map, action_map):
+    """Resize the input and output layers of a state dict.
+
+    Input column i is copied from old observation feature obs_map[i]; new
+    features (-1) get zero weights, so they leave the old function unchanged
+    until training uses them. Output rows follow action_map the same way,
+    with new actions biased to the lowest old score so they start unlikely.
+    """
+    inputs, outputs = LAYERS[algorithm]
+    state = dict(state)
+    for layer in inputs:
+        state[f"{layer}.weight"] = _take(state[f"{layer}.weight"], obs_map, 1, 0.0)
+    for layer in outputs:
+        bias = state[f"{layer}.bias"]
+        state[f"{layer}.weight"] = _take(state[f"{layer}.weight"], action_map, 0, 0.0)
+        state[f"{layer}.bias"] = _take(bias, action_map, 0, float(bias.min()))
+    return state
+
+
+def check_compatible(info, env, obs_map=None):
+    """Observation and action maps from a saved model to env; raises ValueError if it cannot be fine-tuned"""
+    if info.variant != "fp32":
+        raise ValueError(f"{info.name} is a {info.variant} artifact; fine-tune the fp32 model instead")
+    if len(env.observation_space.shape) != 1 or not hasattr(env.action_space, "n"):
+        raise ValueError("Fine-tuning needs a flat observation and a discrete action space")
+
+    obs_dim = env.observation_space.shape[0]
+    action_dim = int(env.action_space.n)
+    if obs_map is None:
+        obs_map = identity_map(info.obs_dim, obs_dim)
+    if len(obs_map) != obs_dim or max(obs_map) >= info.obs_dim:
+        raise ValueError(f"obs_map must give {obs_dim} indices below {info.obs_dim} (or -1 for new features)")
+
+    if info.obs_dim != obs_dim or obs_map != identity_map(info.obs_dim, obs_dim):
+        print(f"  {info.name}: observation {info.obs_dim} -> {obs_dim} features, input layers remapped")
+    if info.action_dim != action_dim:
+        print(f"  {info.name}: actions {info.action_dim} -> {action_dim}, output layers resized")
+    return obs_map, identity_map(info.action_dim, action_dim)
+
+
+class Validator:
+    """Mean reward on a fixed set of episodes, so successive evaluations are comparable.
+
+    With a scenario bank the last episodes of the bank are used, away from
+    the test scenarios at its start.
+    """
+
+    def __init__(self, env, episodes=20):
+        self.env = WorkplaceEnv(
+            event_driven=env.event_driven,
+            config=env.config,
+            scenario_bank=env.scenario_bank,
+            recent_tasks=0,
+        )
+        self.episodes = episodes
+        bank = env.scenario_bank
+        self.scenarios = range(max(0, len(bank) - episodes), len(bank)) if bank is not None else None
+
+    def __call__(self, act):
+        if self.scenarios is None:
+            self.env.reset(seed=VALIDATION_SEED)
+        results = evaluate_policy(act, self.env, self.episodes, scenarios=self.scenarios)
+        return float(np.mean(results["rewards"]))
+
+
+class Plateau:
+    """Early stopping once the validation reward has not improved by min_delta for patience evaluations"""
+
+    def __init__(self, patience=3, min_delta=1.0):
+        self.patience = patience
+        self.min_delta = min_delta
+        self.best = -np.inf
+        self.best_step = 0
+        self.stale = 0
+
+    def update(self, reward, step):
+        if reward > self.best + self.min_delta:
+            self.best = reward
+            self.best_step = step
+            self.stale = 0
+            return True
+        self.stale += 1
+        return False
+
+    @property
+    def stalled(self):
+        return self.stale >= self.patience
+
+
+class PlateauCallback(BaseCallback):
+    """Validates an SB3 model every eval_interval steps, keeps the best weights and stops on a plateau"""
+
+    def __init__(self, validate, plateau, eval_interval, agent_name, verbose=0):
+        super(PlateauCallback, self).__init__(verbose)
+        self.validate = validate
+        self.plateau = plateau
+        self.eval_interval = eval_interval
+        self.agent_name = agent_name
+        self.best_state = None
+
+    def _check(self):
+        reward = self.validate(lambda obs: self.model.predict(obs, deterministic=True)[0])
+        if self.plateau.update(reward, self.num_timesteps):
+            self.best_state = copy.deepcopy(self.model.policy.state_dict())
+        print(f"  {self.agent_name} fine-tuning: {self.num_timesteps:,} steps, validation reward {reward:.2f}")
+
+    def _on_training_start(self):
+        self._check()
+
+    def _on_step(self) -> bool:
+        if self.n_calls % self.eval_interval == 0:
+            self._check()
+        return not self.plateau.stalled
+
+
+def finetune_sb3(info, env, validate, timesteps, eval_interval, patience, obs_map=None):
+    from serving.model_registry import _load_sb3_params
+
+    obs_map, action_map = check_compatible(info, env, obs_map)
+    make = make_ppo if info.algorithm == "ppo" else make_dqn
+    model = make(env, **FINETUNE_PARAMS[info.algorithm])
+    model.policy.load_state_dict(remap_state(_load_sb3_params(info.path), info.algorithm, obs_map, action_map))
+    if info.algorithm == "ppo":
+        # PPO only updates once per rollout; validating more often measures the same weights
+        eval_interval = max(eval_interval, model.n_steps)
+
+    callback = PlateauCallback(validate, Plateau(patience), eval_interval, info.algorithm.upper())
+    model.learn(total_timesteps=timesteps, callback=callback)
+    if callback.plateau.stalled:
+        print(f"  stopped early: no improvement since step {callback.plateau.best_step:,}")
+    model.policy.load_state_dict(callback.best_state)
+    model.num_timesteps += info.training_steps or 0
+    return model
+
+
+def finetune_pg(info, env, validate, timesteps, eval_interval, patience, obs_map=None):
+    from serving.model_registry import _load_pg_checkpoint
+
+    obs_map, action_map = check_compatible(info, env, obs_map)
+    agent = make_pg(env, **FINETUNE_PARAMS["pg"])
+    checkpoint = _load_pg_checkpoint(info.path)
+    agent.network.load_state_dict(remap_state(checkpoint["model_state_dict"], "pg", obs_map, action_map))
+
+    plateau = Plateau(patience)
+    best_state = None
+    steps = 0
+    next_eval = 0
+    while steps < timesteps and not plateau.stalled:
+        if steps >= next_eval:
+            reward = validate(pg_greedy(agent, validate.env))
+            if plateau.update(reward, steps):
+                best_state = copy.deepcopy(agent.network.state_dict())
+            print(f"  PG fine-tuning: {steps:,} steps, validation reward {reward:.2f}")
+            next_eval += eval_interval
+        _, episode_steps, _ = run_pg_episode(agent, env)
+        steps += episode_steps
+
+    if plateau.stalled:
+        print(f"  stopped early: no improvement since step {plateau.best_step:,}")
+    agent.network.load_state_dict(best_state)
+    agent.timesteps += info.training_steps or 0
+    return agent
+
+
+def finetune_agents(env, models_dir="models", algorithms=("ppo", "dqn", "pg"), timesteps=FINETUNE_TIMESTEPS,
+                    eval_interval=EVAL_INTERVAL, eval_episodes=20, patience=3, test_scenarios=None, obs_map=None,
+                    out_dir=None):
+    """Continue training the saved models on env, save them to out_dir and test them like train_agents.
+
+    out_dir defaults to models_dir/finetuned and may not be models_dir
+    itself, so the source models are never overwritten.
+    """
+    from serving.model_registry import ModelRegistry
+
+    out_dir = out_dir or os.path.join(models_dir, "finetuned")
+    if os.path.realpath(out_dir) == os.path.realpath(models_dir):
+        raise ValueError("out_dir must differ from models_dir so the source models are kept")
+    os.makedirs(out_dir, exist_ok=True)
+
+    registry = ModelRegistry(models_dir)
+    validate = Validator(env, eval_episodes)
+    print(f"Fine-tuning config: up to {timesteps:,} timesteps per agent, validating every {eval_interval:,}")
+
+    results = {}
+    for algorithm in algorithms:
+        info = registry.info(algorithm)
+        print(f"\nFine-tuning {info.display_name} from {info.path} ({info.training_steps or 0:,} steps)...")
+        start_time = time.time()
+        path = os.path.join(out_dir, os.path.basename(info.path))
+
+        if algorithm == "pg":
+            agent = finetune_pg(info, env, validate, timesteps, eval_interval, patience, obs_map)
+            agent.save(path)
+            act = pg_greedy(agent, env)
+        else:
+            model = finetune_sb3(info, env, validate, timesteps, eval_interval, patience, obs_map)
+            model.save(path)
+            act = lambda obs, model=model: model.predict(obs, deterministic=True)[0]
+        print(f"  {info.display_name} fine-tuned in {time.time() - start_time:.1f} seconds, saved to {path}")
+
+        print(f"  testing {info.display_name} agent...")
+        if test_scenarios is None:
+            env.reset(seed=0)
+        results[algorithm] = evaluate_policy(act, env, 100, info.display_name, test_scenarios)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fine-tune the saved models on a changed environment")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--out", help="directory for the fine-tuned models (default: MODELS_DIR/finetuned)")
+    parser.add_argument("--algos", nargs="+", choices=["ppo", "dqn", "pg"], default=["ppo", "dqn", "pg"])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="default")
+    parser.add_argument("--timesteps", type=int, default=FINETUNE_TIMESTEPS)
+    parser.add_argument("--eval-interval", type=int, default=EVAL_INTERVAL)
+    parser.add_argument("--eval-episodes", type=int, default=20)
+    parser.add_argument("--patience", type=int, default=3)
+    parser.add_argument(
+        "--obs-map", type=int, nargs="+",
+        help="old feature index for each new observation feature, -1 for new ones (default: by position)",
+    )
+    args = parser.parse_args()
+
+    env = WorkplaceEnv(config=get_scenario(args.scenario), recent_tasks=0)
+    results = finetune_agents(
+        env, args.models_dir, args.algos, args.timesteps, args.eval_interval,
+        args.eval_episodes, args.patience, obs_map=args.obs_map, out_dir=args.out,
+    )
+    for algorithm, result in results.items():
+        print(f"  {algorithm.upper()}: {np.mean(result['rewards']):.2f} +/- {np.std(result['rewards']):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+
+import argparse
+import time
+
+import pygame
+
+from environment.rendering import GameVisualization
+from training.telemetry import TelemetryBuffer, slot_stats
+
+
+DEFAULT_RUN = "workplace_telemetry"
+
+
+class TrainingMonitor(GameVisualization):
+    """Live dashboard of a training run's telemetry, in the playback dashboard's style.
+
+    The monitor only ever reads the run's shared-memory buffer, so it can be
+    started before the run (it waits for it), attached and detached while
+    the run trains, and closed at any time without affecting training.
+    """
+
+    COLUMNS = 3
+    CARD_HEIGHT = 170
+
+    def __init__(self, run=DEFAULT_RUN, render_mode="human", window=100):
+        super().__init__(None, render_mode)
+        if render_mode != "rgb_array":
+            pygame.display.set_caption("Workplace Agent - Training Monitor")
+        self.run = run
+        self.window = window
+        self.buffer = None
+        self.detached = False
+        self.finished = False
+        self.stats = []
+
+    def attach(self):
+        try:
+            self.buffer = TelemetryBuffer.attach(self.run)
+        except FileNotFoundError:
+            self.buffer = None
+        self.detached = False
+        return self.buffer is not None
+
+    def detach(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+        self.detached = True
+
+    def poll(self):
+        """Refresh the statistics of every slot that has started"""
+        if self.detached:
+            return
+        if self.buffer is None and not self.attach():
+            return
+
+        stats = []
+        for slot in self.buffer.active_slots():
+            slot_data = slot_stats(self.buffer.read(slot, self.window), self.window)
+            if slot_data is not None:
+                slot_data["episodes"] = self.buffer.episodes(slot)
+            stats.append((self.buffer.label(slot), slot_data))
+        self.stats = stats
+
+        # The owner marks the run finished before removing the segment;
+        # keep showing the final numbers
+        self.finished = self.buffer.closed
+        if self.finished:
+            self.buffer.close()
+            self.buffer = None
+            self.detached = True
+
+    def status(self):
+        interactive = self.render_mode == "human"
+        if self.finished:
+            return "Run finished", self.COLORS['secondary']
+        if self.detached:
+            return "Detached (press A to attach)" if interactive else "Detached", self.COLORS['warning']
+        if self.buffer is None:
+            return "Waiting for run...", self.COLORS['warning']
+        return "Attached (press D to detach)" if interactive else "Attached", self.COLORS['success']
+
+    def draw_header(self):
+        header_rect = pygame.Rect(0, 0, self.width, 120)
+        self.draw_rounded_rect(self.screen, self.COLORS['primary'], header_rect, radius=0, shadow=False)
+
+        title_text = self.fonts['title'].render("Training Monitor", True, self.COLORS['white'])
+        self.screen.blit(title_text, (self.MARGIN, 20))
+        run_text = self.fonts['medium'].render(f"Run: {self.run}", True, self.COLORS['white'])
+        self.screen.blit(run_text, (self.MARGIN, 70))
+
+        status, color = self.status()
+        badge_rect = pygame.Rect(self.MARGIN + 300, 68, 300, 26)
+        self.draw_rounded_rect(self.screen, self.COLORS['white'], badge_rect, radius=13, shadow=False)
+        status_text = self.fonts['small'].render(status, True, color)
+        self.screen.blit(status_text, status_text.get_rect(center=badge_rect.center))
+
+        total_rate = sum(data["steps_per_sec"] for _, data in self.stats if data and data["age"] < 60)
+        rate_label = self.fonts['medium'].render("Total throughput", True, self.COLORS['white'])
+        self.screen.blit(rate_label, (self.width - 350, 25))
+        rate_text = self.fonts['large'].render(f"{total_rate:,.0f} steps/s", True, self.COLORS['white'])
+        self.screen.blit(rate_text, (self.width - 350, 55))
+
+    def draw_sparkline(self, rect, values, color):
+        pygame.draw.rect(self.screen, self.COLORS['gray_light'], rect, border_radius=6)
+        if len(values) < 2:
+            return
+        low, high = float(values.min()), float(values.max())
+        span = high - low or 1.0
+        points = [
+            (rect.x + i * (rect.width - 1) / (len(values) - 1), rect.bottom - 1 - (v - low) / span * (rect.height - 2))
+            for i, v in enumerate(values)
+        ]
+        pygame.draw.lines(self.screen, color, False, points, 2)
+
+    def draw_slot_card(self, x, y, width, height, label, data):
+        card_rect = pygame.Rect(x, y, width, height)
+        self.draw_rounded_rect(self.screen, self.COLORS['white'], card_rect)
+
+        title = self.fonts['medium'].render(label, True, self.COLORS['black'])
+        self.screen.blit(title, (x + 20, y + 12))
+
+        if data is None:
+            waiting = self.fonts['small'].render("Waiting for the first episode...", True, self.COLORS['secondary'])
+            self.screen.blit(waiting, (x + 20, y + 45))
+            return
+
+        stale = data["age"] > 60
+        rate = "idle" if stale else f"{data['steps_per_sec']:,.0f} steps/s"
+        rate_text = self.fonts['small'].render(
+            f"{rate} | {data['episodes']:,} episodes | {data['steps']:,} steps",
+            True, self.COLORS['secondary'],
+        )
+        self.screen.blit(rate_text, (x + 20, y + 38))
+
+        reward_text = self.fonts['large'].render(f"{data['reward']:.1f}", True, self.COLORS['primary'])
+        self.screen.blit(reward_text, (x + 20, y + 60))
+        reward_label = self.fonts['tiny'].render(f"reward (last {len(data['rewards'])})", True, self.COLORS['secondary'])
+        self.screen.blit(reward_label, (x + 20, y + 88))
+
+        trust_color = self.COLORS['success'] if data["trust"] > 50 else (
+            self.COLORS['warning'] if data["trust"] > 20 else self.COLORS['danger']
+        )
+        trust_text = self.fonts['large'].render(f"{data['trust']:.0f}", True, trust_color)
+        self.screen.blit(trust_text, (x + 150, y + 60))
+        trust_label = self.fonts['tiny'].render("final trust", True, self.COLORS['secondary'])
+        self.screen.blit(trust_label, (x + 150, y + 88))
+
+        self.draw_sparkline(pygame.Rect(x + 250, y + 60, width - 270, 40), data["rewards"], self.COLORS['primary'])
+
+        survival = data["survival_rate"]
+        bar_color = self.COLORS['success'] if survival > 0.5 else (
+            self.COLORS['warning'] if survival > 0.2 else self.COLORS['danger']
+        )
+        survival_text = self.fonts['small'].render(f"Survival rate: {survival:.0%}", True, self.COLORS['secondary'])
+        self.screen.blit(survival_text, (x + 20, y + 110))
+        self.draw_progress_bar(
+            self.screen, x + 20, y + 130, width - 40, 18, survival,
+            self.COLORS['gray_light'], bar_color,
+        )
+
+    def render(self):
+        self.screen.fill(self.COLORS['background'])
+        self.draw_header()
+
+        card_width = (self.width - 2 * self.MARGIN - (self.COLUMNS - 1) * 20) // self.COLUMNS
+        rows = (self.height - 140) // (self.CARD_HEIGHT + 20)
+        shown = self.stats[:rows * self.COLUMNS]
+        for i, (label, data) in enumerate(shown):
+            row, column = divmod(i, self.COLUMNS)
+            self.draw_slot_card(
+                self.MARGIN + column * (card_width + 20), 140 + row * (self.CARD_HEIGHT + 20),
+                card_width, self.CARD_HEIGHT, label, data,
+            )
+        if len(self.stats) > len(shown):
+            more = self.fonts['small'].render(
+                f"+{len(self.stats) - len(shown)} more runs not shown", True, self.COLORS['secondary']
+            )
+            self.screen.blit(more, (self.MARGIN, self.height - 25))
+
+        return self.present()
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+        super().close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch the telemetry of a running training job")
+    parser.add_argument("--run", default=DEFAULT_RUN, help="telemetry name given to the training run")
+    parser.add_argument("--window", type=int, default=100, help="episodes in the rolling statistics")
+    parser.add_argument("--refresh", type=float, default=2.0, help="redraws per second")
+    parser.add_argument("--snapshot", help="render one frame headless to this image file and exit")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        monitor = TrainingMonitor(args.run, "rgb_array", args.window)
+        monitor.poll()
+        monitor.render()
+        pygame.image.save(monitor.screen, args.snapshot)
+        print(f"Saved {args.snapshot} ({len(monitor.stats)} runs, {monitor.status()[0].lower()})")
+        monitor.close()
+        return
+
+    monitor = TrainingMonitor(args.run, "human", args.window)
+    print("Training Monitor")
+    print("Controls:")
+    print("  D: Detach from the run")
+    print("  A: Attach again")
+    print("  ESC: Quit monitor (training keeps running)")
+
+    running = True
+    last_poll = 0.0
+    clock = pygame.time.Clock()
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_d:
+                    monitor.detach()
+                elif event.key == pygame.K_a:
+                    monitor.finished = False
+                    monitor.attach()
+
+        if time.time() - last_poll > 1 / args.refresh:
+            monitor.poll()
+            monitor.render()
+            last_poll = time.time()
+        clock.tick(30)
+
+    monitor.close()
+
+
+if __name__ == "__main__":
+    main()
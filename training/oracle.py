@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from environment.custom_env import TASK_TYPES, Task
+from environment.scenarios import WORK_ACTIONS
+from environment.scenario_bank import ScenarioBank
+
+
+# Doomed active tasks (that cannot finish before their deadline) all share
+# this progress value; only their deadline and the +0.1 per worked minute
+# still matter
+DOOMED = -1
+
+
+class HindsightOracle:
+    """Best achievable return of a WorkplaceEnv episode with known arrivals.
+
+    The search walks the day minute by minute, memoizing on a canonical
+    state key: the index of the next task the FIFO will hand out (together
+    with the time this determines the whole queue) and the active tasks in
+    arrival order, with the progress of tasks that can no longer meet their
+    deadline collapsed. Of the states sharing a key and trust only the one
+    with the best return so far is kept. More trust does not dominate less:
+    once the day is lost, running out of trust sooner stops the losses.
+    Trust above the most that can still be lost is capped, as it can no
+    longer end the day.
+
+    Only invalid actions are dropped (they cost 1 and otherwise wait), and
+    every task a work action can reach is expanded, so without max_states
+    the result is the optimal return, an upper bound on any agent's return
+    for the same arrivals. Its actions replay to exactly the same return in
+    the env.
+
+    The exact search can keep a few hundred thousand states per minute and
+    take minutes on an overloaded day; max_states bounds the states kept
+    per minute for speed, at the cost of that guarantee.
+    """
+
+    def __init__(self, config, max_states=None):
+        if config.num_workers != 1:
+            raise ValueError("The oracle only models single-worker scenarios")
+        self.config = config
+        self.max_states = max_states
+
+    def _load_trace(self, trace):
+        self.arrive = [int(m) for m in trace["minute"]]
+        tasks = [Task(TASK_TYPES[code], minute) for minute, code in zip(self.arrive, trace["type"].tolist())]
+        self.deadline = [task.deadline for task in tasks]
+        self.duration = [task.duration for task in tasks]
+        self.reward = [task.reward for task in tasks]
+        self.loss = [task.loss for task in tasks]
+        self.loss_late = [task.loss_late for task in tasks]
+
+        total = self.config.total_minutes
+        self.expiring = [[] for _ in range(total + 1)]
+        for i, deadline in enumerate(self.deadline):
+            if deadline <= total:
+                self.expiring[deadline].append(i)
+
+        # trust_cap[t]: the most trust that can still be lost after minute t
+        self.trust_cap = [0] * (total + 2)
+        for i, deadline in enumerate(self.deadline):
+            self.trust_cap[min(deadline, total + 1) - 1] += self.loss_late[i]
+        for t in reversed(range(total + 1)):
+            self.trust_cap[t] += self.trust_cap[t + 1]
+
+    def _next_task(self, t, head):
+        """Index of the first task the FIFO would hand out at minute t, or None"""
+        n = len(self.arrive)
+        while head < n and self.arrive[head] <= t:
+            if self.deadline[head] > t:
+                return head
+            head += 1
+        return None
+
+    def _canonical(self, t, active):
+        return tuple(
+            (i, DOOMED if progress == DOOMED or t + self.duration[i] - progress > self.deadline[i] else progress)
+            for i, progress in active
+        )
+
+    def _moves(self, t, head, active):
+        """(action, reward, trust gain, head, active) for every valid move at minute t"""
+        moves = []
+        if len(active) < self.config.max_working_tasks:
+            i = self._next_task(t, head)
+            if i is not None:
+                moves.append((1, 1, 0, i + 1, active + ((i, 0),)))
+
+        # Every task the work actions can reach is tried; the memo absorbs
+        # most of the branching. Working any doomed task earns the same +0.1
+        # and leaves the state as it is, so one such move is enough.
+        doomed = unfinished = False
+        for index in range(min(WORK_ACTIONS, len(active))):
+            i, progress = active[index]
+            if progress == DOOMED:
+                if not doomed:
+                    moves.append((index + 2, 0.1, 0, head, active))
+                doomed = unfinished = True
+            elif progress + 1 >= self.duration[i]:
+                done = active[:index] + active[index + 1:]
+                moves.append((index + 2, self.reward[i], self.reward[i], head, done))
+            else:
+                worked = active[:index] + ((i, progress + 1),) + active[index + 1:]
+                moves.append((index + 2, 0.1, 0, head, worked))
+                unfinished = True
+
+        # A minute of work that finishes nothing beats waiting: the worked
+        # state can copy whatever the waiting one does and skip one later
+        # minute on that task. Otherwise waiting can pay even with work at
+        # hand, since finishing tasks later keeps trust low, which ends a
+        # lost day sooner.
+        if not unfinished:
+            moves.append((0, 0, 0, head, active))
+        return moves
+
+    def _advance(self, t, head, active):
+        """Deadline losses at minute t (just reached); returns (reward, trust change, active)"""
+        loss = 0
+        for i in self.expiring[t]:
+            if i >= head:
+                loss += self.loss[i]
+
+        if active and any(self.deadline[i] <= t for i, _ in active):
+            loss += sum(self.loss_late[i] for i, _ in active if self.deadline[i] <= t)
+            active = tuple(task for task in active if self.deadline[task[0]] > t)
+
+        bonus = t % 60 == 0
+        return (
+            -loss + (5 if bonus else 0),
+            -loss + (self.config.hourly_bonus if bonus else 0),
+            active,
+        )
+
+    def solve(self, trace, return_actions=False):
+        """Optimal return for one arrival trace (and the actions reaching it).
+
+        Exact when max_states is None; with max_states it is only a lower
+        bound on the optimum.
+        """
+        self._load_trace(trace)
+        total = self.config.total_minutes
+
+        # (queue head, active tasks) -> {trust: best state with that trust},
+        # each state stored as (return so far, trust, parent state, action)
+        start = (0.0, self.config.starting_trust, None, None)
+        layer = {(0, ()): {start[1]: start}}
+        best = (-math.inf, None, None)
+
+        for t in range(total):
+            next_layer = {}
+            # Cap for trust above the most that can still be lost: more changes nothing
+            cap = self.trust_cap[t + 1] + 1
+            for (head, active), states in layer.items():
+                # A move and the minute it ends change every state of a key alike
+                for action, reward, trust_gain, new_head, new_active in self._moves(t, head, active):
+                    step_reward, trust_change, new_active = self._advance(t + 1, new_head, new_active)
+                    gain = reward + step_reward
+                    change = trust_gain + trust_change
+                    key = front = None
+                    if t + 1 < total:
+                        key = (new_head, self._canonical(t + 1, new_active))
+
+                    for trust, state in states.items():
+                        new_ret = state[0] + gain
+                        new_trust = trust + change
+                        if new_trust <= 0 or key is None:
+                            final = new_ret - 50 if new_trust <= 0 else new_ret + 50
+                            if final > best[0]:
+                                best = (final, state, action)
+                            continue
+
+                        if front is None:
+                            front = next_layer.setdefault(key, {})
+                        new_trust = min(new_trust, cap)
+                        other = front.get(new_trust)
+                        if other is None or new_ret > other[0]:
+                            # Parents are only needed to recover the actions; dropping
+                            # them frees every earlier minute's states
+                            parent = state if return_actions else None
+                            front[new_trust] = (new_ret, new_trust, parent, action)
+
+            if self.max_states:
+                next_layer = self._keep_best(next_layer)
+            layer = next_layer
+
+        best_return, state, action = best
+        if not return_actions:
+            return best_return
+
+        actions = [action]
+        while state[3] is not None:
+            actions.append(state[3])
+            state = state[2]
+        return best_return, actions[::-1]
+
+    def _keep_best(self, layer):
+        states = [(state[0], key) for key, front in layer.items() for state in front.values()]
+        if len(states) <= self.max_states:
+            return layer
+        cutoff = sorted((ret for ret, _ in states), reverse=True)[self.max_states - 1]
+        kept = {}
+        for key, front in layer.items():
+            front = {trust: state for trust, state in front.items() if state[0] >= cutoff}
+            if front:
+                kept[key] = front
+        return kept
+
+
+def _solve_scenarios(bank, scenarios, max_states):
+    oracle = HindsightOracle(bank.config, max_states)
+    return [oracle.solve(bank.trace(i)) for i in scenarios]
+
+
+def label_bank(bank, scenarios=None, max_states=None, workers=1):
+    """Oracle returns for bank scenarios, computed in parallel and cached in the bank directory"""
+    path = os.path.join(bank.path, f"oracle_{max_states}.npy" if max_states else "oracle.npy")
+    labels = np.load(path) if os.path.exists(path) else np.full(len(bank), np.nan)
+    scenarios = range(len(bank)) if scenarios is None else scenarios
+    missing = [i for i in scenarios if np.isnan(labels[i])]
+
+    if missing:
+        chunks = [missing[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk, values in zip(chunks, pool.map(_solve_scenarios, [bank] * workers, chunks, [max_states] * workers)):
+                labels[chunk] = values
+        np.save(path, labels)
+
+    return labels[list(scenarios)]
+
+
+def regret(results, oracle_returns):
+    """Per-episode oracle return minus agent return, for results on bank scenarios"""
+    return np.asarray(oracle_returns) - np.asarray(results["rewards"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Label scenario bank episodes with their hindsight-optimal return")
+    parser.add_argument("--bank", default="scenarios/default")
+    parser.add_argument("--scenarios", type=int, help="label scenarios 0..N-1 (default: all)")
+    parser.add_argument("--max-states", type=int, help="keep at most this many states per minute (faster, but no longer an upper bound)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    bank = ScenarioBank(args.bank)
+    scenarios = range(min(args.scenarios or len(bank), len(bank)))
+    print(f"Labelling {len(scenarios)} scenarios of {bank} with {args.workers} workers")
+
+    start = time.time()
+    labels = label_bank(bank, scenarios, args.max_states, args.workers)
+    elapsed = time.time() - start
+
+    print(f"  Done in {elapsed:.1f} seconds")
+    print(f"  Oracle return: {labels.mean():.2f} +/- {labels.std():.2f} (min {labels.min():.2f}, max {labels.max():.2f})")
+    print(f"  Labels cached in {bank.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from environment.scenarios import SCENARIOS
+
+
+ALGORITHMS = ("ppo", "dqn", "pg")
+
+# Two-sided 95% Student t critical values by degrees of freedom; above 30
+# the normal value is close enough
+T_CRITICAL_95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+
+# Rough relative cost per timestep, used to start the longest jobs first
+ALGORITHM_COST = {"dqn": 3.0, "ppo": 1.5, "pg": 1.0}
+
+EVAL_SEED = 10_000
+
+
+def mean_ci(values):
+    """Mean and 95% t confidence interval of per-seed values"""
+    values = np.asarray(values, dtype=np.float64)
+    mean = float(values.mean())
+    if len(values) < 2:
+        return mean, mean, mean
+    df = len(values) - 1
+    t = T_CRITICAL_95[df - 1] if df <= len(T_CRITICAL_95) else 1.96
+    half_width = t * values.std(ddof=1) / np.sqrt(len(values))
+    return mean, float(mean - half_width), float(mean + half_width)
+
+
+def job_id(job):
+    return f"{job['algo']}_{job['config']}_seed{job['seed']}"
+
+
+def expand_jobs(algorithms, configs, seeds):
+    return [
+        {"algo": algo, "config": config, "seed": seed}
+        for algo, config, seed in itertools.product(algorithms, configs, seeds)
+    ]
+
+
+def _pin_worker(core_groups, threads):
+    """Pool initializer: claim a group of cores and size torch's thread pool to it"""
+    import torch
+
+    cores = core_groups.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    torch.set_num_threads(threads)
+
+
+def run_job(job, timesteps, eval_episodes, bank_path, out_path, telemetry=None):
+    """Train one (algorithm, config, seed) job, evaluate it and write its record.
+
+    telemetry is (buffer name, slot) to publish training episodes to, or None.
+    """
+    import torch
+
+    from environment.custom_env import WorkplaceEnv
+    from training.dqn_training import TelemetryCallback, make_dqn, make_pg, make_ppo, pg_greedy, run_pg_episode
+    from training.telemetry import TelemetryBuffer
+    from training.evaluation import evaluate_policy
+
+    start = time.time()
+    seed = job["seed"]
+    bank = None
+    if bank_path:
+        from environment.scenario_bank import ScenarioBank
+        bank = ScenarioBank(bank_path)
+
+    env = WorkplaceEnv(config=SCENARIOS[job["config"]], scenario_bank=bank, recent_tasks=0)
+    env.reset(seed=seed)
+    torch.manual_seed(seed)
+
+    writer = None
+    if telemetry is not None:
+        buffer = TelemetryBuffer.attach(telemetry[0])
+        writer = buffer.writer(telemetry[1], job_id(job), env.TOTAL_MINUTES)
+
+    if job["algo"] == "pg":
+        agent = make_pg(env)
+        steps = 0
+        while steps < timesteps:
+            reward, episode_steps, info = run_pg_episode(agent, env)
+            steps += episode_steps
+            if writer is not None:
+                writer.episode(reward, episode_steps, env.current_time, info["trust_points"])
+        act = pg_greedy(agent, env)
+    else:
+        make = make_ppo if job["algo"] == "ppo" else make_dqn
+        model = make(env, seed=seed)
+        model.learn(total_timesteps=timesteps, callback=TelemetryCallback(writer) if writer is not None else None)
+        act = lambda obs: model.predict(obs, deterministic=True)[0]
+    if telemetry is not None:
+        buffer.close()
+    train_time = time.time() - start
+
+    # Every job is tested on the same arrivals, so results pair across jobs
+    if bank is not None:
+        results = evaluate_policy(act, env, scenarios=range(min(eval_episodes, len(bank))))
+    else:
+        env.reset(seed=EVAL_SEED)
+        results = evaluate_policy(act, env, eval_episodes)
+
+    record = {
+        **job,
+        "job_id": job_id(job),
+        "timesteps": timesteps,
+        "train_time": train_time,
+        "wall_time": time.time() - start,
+        "results": {key: [float(v) for v in values] for key, values in results.items()},
+    }
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(record, f)
+    os.replace(tmp_path, out_path)
+    return record
+
+
+class Experiment:
+    """A directory of per-job result files; finished jobs are skipped on restart"""
+
+    def __init__(self, path, spec):
+        self.path = path
+        self.jobs_dir = os.path.join(path, "jobs")
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+        spec_path = os.path.join(path, "experiment.json")
+        if os.path.exists(spec_path):
+            with open(spec_path) as f:
+                saved = json.load(f)
+            if {k: saved[k] for k in ("timesteps", "eval_episodes", "bank")} != \
+                    {k: spec[k] for k in ("timesteps", "eval_episodes", "bank")}:
+                raise ValueError(f"{path} was started with different settings; use another --name")
+        with open(spec_path, "w") as f:
+            json.dump(spec, f, indent=2)
+
+    def job_path(self, job):
+        return os.path.join(self.jobs_dir, job_id(job) + ".json")
+
+    def is_done(self, job):
+        return os.path.exists(self.job_path(job))
+
+    def records(self):
+        records = []
+        for filename in sorted(os.listdir(self.jobs_dir)):
+            if filename.endswith(".json"):
+                with open(os.path.join(self.jobs_dir, filename)) as f:
+                    records.append(json.load(f))
+        return records
+
+
+def summarize(records):
+    """Per (config, algorithm): seed-level mean reward and survival with 95% CIs"""
+    summary = {}
+    for record in records:
+        key = (record["config"], record["algo"])
+        summary.setdefault(key, []).append(record)
+
+    out = {}
+    for (config, algo), group in sorted(summary.items(), key=lambda item: (item[0][0], ALGORITHMS.index(item[0][1]))):
+        group.sort(key=lambda r: r["seed"])
+        total_minutes = SCENARIOS[config].total_minutes
+        seed_rewards = [np.mean(r["results"]["rewards"]) for r in group]
+        seed_survival = [
+            np.mean([t >= total_minutes for t in r["results"]["survival_times"]]) for r in group
+        ]
+        reward, reward_low, reward_high = mean_ci(seed_rewards)
+        survival, survival_low, survival_high = mean_ci(seed_survival)
+        out.setdefault(config, {})[algo] = {
+            "seeds": [r["seed"] for r in group],
+            "seed_rewards": [float(v) for v in seed_rewards],
+            "mean_reward": reward,
+            "reward_ci": [reward_low, reward_high],
+            "survival_rate": survival,
+            "survival_ci": [max(0.0, survival_low), min(1.0, survival_high)],
+        }
+    return out
+
+
+def pooled_results(records, config):
+    """All evaluation episodes of a config pooled per algorithm, in the shape analyze_results expects"""
+    results = {}
+    for record in sorted(records, key=lambda r: (ALGORITHMS.index(r["algo"]), r["seed"])):
+        if record["config"] != config:
+            continue
+        pooled = results.setdefault(record["algo"], {"rewards": [], "survival_times": [], "trust_points": []})
+        for key in ("rewards", "survival_times", "trust_points"):
+            pooled[key].extend(record["results"][key])
+        if "scenarios" in record["results"]:
+            pooled.setdefault("scenarios", []).extend(record["results"]["scenarios"])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train every algorithm over many seeds and configs in parallel")
+    parser.add_argument("--name", default="study")
+    parser.add_argument("--algos", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument("--configs", nargs="+", choices=sorted(SCENARIOS), default=["default"])
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--timesteps", type=int, default=480 * 500)
+    parser.add_argument("--eval-episodes", type=int, default=100)
+    parser.add_argument("--bank", help="scenario bank to evaluate every job on")
+    parser.add_argument("--threads-per-job", type=int, default=1)
+    parser.add_argument("--out", default="experiments")
+    parser.add_argument(
+        "--telemetry",
+        metavar="NAME",
+        help="publish per-episode telemetry under NAME for python -m training.monitor --run NAME",
+    )
+    args = parser.parse_args()
+
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count()))
+    workers = max(1, len(cores) // args.threads_per_job)
+    spec = {
+        "algos": args.algos,
+        "configs": args.configs,
+        "seeds": args.seeds,
+        "timesteps": args.timesteps,
+        "eval_episodes": args.eval_episodes,
+        "bank": args.bank,
+    }
+    experiment = Experiment(os.path.join(args.out, args.name), spec)
+
+    jobs = expand_jobs(args.algos, args.configs, range(args.seeds))
+    pending = [job for job in jobs if not experiment.is_done(job)]
+    pending.sort(
+        key=lambda job: ALGORITHM_COST[job["algo"]] * SCENARIOS[job["config"]].num_workers,
+        reverse=True,
+    )
+    print(f"{len(jobs)} jobs, {len(jobs) - len(pending)} already done, {len(pending)} to run")
+    print(f"  {workers} workers x {args.threads_per_job} threads on cores {cores}")
+
+    # One telemetry slot per job, numbered by its place in the full job list
+    telemetry = None
+    slots = {job_id(job): slot for slot, job in enumerate(jobs)}
+    if args.telemetry and pending:
+        from training.telemetry import TelemetryBuffer
+        telemetry = TelemetryBuffer.create(args.telemetry, slots=len(jobs))
+        print(f"  publishing telemetry as {args.telemetry!r}")
+
+    start = time.time()
+    if pending:
+        core_groups = multiprocessing.Queue()
+        for i in range(workers):
+            core_groups.put(set(cores[i * args.threads_per_job:(i + 1) * args.threads_per_job]))
+
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_pin_worker,
+            initargs=(core_groups, args.threads_per_job),
+        )
+        try:
+            futures = {
+                pool.submit(
+                    run_job, job, args.timesteps, args.eval_episodes, args.bank, experiment.job_path(job),
+                    (args.telemetry, slots[job_id(job)]) if telemetry is not None else None,
+                ): job
+                for job in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                print(
+                    f"  [{done}/{len(pending)}] {record['job_id']}: "
+                    f"{np.mean(record['results']['rewards']):.2f} ({record['wall_time']:.0f}s)"
+                )
+        except KeyboardInterrupt:
+            print("\nInterrupted; finished jobs are kept, rerun the same command to resume")
+            pool.shutdown(wait=False, cancel_futures=True)
+            return
+        finally:
+            if telemetry is not None:
+                telemetry.close()
+        pool.shutdown()
+        print(f"\nRan {len(pending)} jobs in {time.time() - start:.1f} seconds")
+
+    records = experiment.records()
+    summary = summarize(records)
+    with open(os.path.join(experiment.path, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"  Summary saved to {os.path.join(experiment.path, 'summary.json')}")
+
+    from run_training import analyze_results
+
+    for config in args.configs:
+        print(f"\n=== {config} ===")
+        analyze_results(
+            pooled_results(records, config),
+            seed_summary=summary.get(config),
+            total_minutes=SCENARIOS[config].total_minutes,
+            plot_path=os.path.join(experiment.path, f"training_results_{config}.png"),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,25 +3,36 @@ import torch.nn as nn
 import torch.optim as optim
 
 
+def build_policy_network(state_dim, action_dim):
+    return nn.Sequential(
+        nn.Linear(state_dim, 128),
+        nn.ReLU(),
+        nn.Linear(128, 64),
+        nn.ReLU(),
+        nn.Linear(64, action_dim),
+        nn.Softmax(dim=-1),
+    )
+
+
 class PolicyGradient:
     def __init__(self, state_dim, action_dim, lr=0.01):
-        self.network = nn.Sequential(
-            nn.Linear(state_dim, 128),
-            nn.ReLU(),
-            nn.Linear(128, 64),
-            nn.ReLU(),
-            nn.Linear(64, action_dim),
-            nn.Softmax(dim=-1),
-        )
+        self.network = build_policy_network(state_dim, action_dim)
         self.optimizer = optim.Adam(self.network.parameters(), lr=lr)
         self.saved_log_probs = []
         self.rewards = []
+        self.state_dim = int(state_dim)
+        self.action_dim = int(action_dim)
+        self.timesteps = 0
 
-    def select_action(self, state):
+    def select_action(self, state, action_mask=None):
         state = torch.FloatTensor(state).unsqueeze(0)
         probs = self.network(state)
+        if action_mask is not None:
+            # Zeroing invalid actions and renormalizing is a softmax over the masked logits
+            probs = probs.masked_fill(~torch.as_tensor(action_mask).unsqueeze(0), 0.0)
         action_dist = torch.distributions.Categorical(probs)
         action = action_dist.sample()
+        self.timesteps += 1
         self.saved_log_probs.append(action_dist.log_prob(action))
         return action.item()
 
@@ -48,3 +59,21 @@ class PolicyGradient:
 
         del self.rewards[:]
         del self.saved_log_probs[:]
+
+    def save(self, path):
+        torch.save({
+            'model_state_dict': self.network.state_dict(),
+            'optimizer_state_dict': self.optimizer.state_dict(),
+            'state_dim': self.state_dim,
+            'action_dim': self.action_dim,
+            'timesteps': self.timesteps
+        }, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        checkpoint = torch.load(path, weights_only=False)
+        agent = cls(checkpoint['state_dim'], checkpoint['action_dim'], **kwargs)
+        agent.network.load_state_dict(checkpoint['model_state_dict'])
+        agent.optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
+        agent.timesteps = checkpoint.get('timesteps', 0)
+        return agent
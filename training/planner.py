@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+import argparse
+import copy
+import math
+import random
+import time
+
+import numpy as np
+
+from environment.custom_env import WorkplaceEnv
+from environment.scenarios import SCENARIOS, get_scenario
+from training.evaluation import evaluate_policy
+
+
+def busy_policy(capacity):
+    """Pick up whenever there is room, otherwise work the first active task"""
+    def act(obs):
+        if obs[3] > 0 and obs[2] < capacity:
+            return 1
+        return 2 if obs[2] > 0 else 0
+    return act
+
+
+def valid_actions(env):
+    """Actions that change something; action 5 only waits, like action 0"""
+    actions = [0]
+    if env.available_tasks and len(env.active_tasks) < env.MAX_WORKING_TASKS:
+        actions.append(1)
+    actions.extend(range(2, 2 + min(3, len(env.active_tasks))))
+    return actions
+
+
+class Node:
+    __slots__ = ("children", "actions", "visits", "value")
+
+    def __init__(self):
+        self.children = {}
+        self.actions = None
+        self.visits = 0
+        self.value = 0.0
+
+
+class LookaheadPlanner:
+    """Open-loop Monte Carlo tree search from WorkplaceEnv snapshots.
+
+    Each rollout restores the snapshot of the real env into a private lean
+    simulator, reseeds its arrival RNG so every rollout samples a different
+    future (restoring the real RNG would plan against the one future the
+    env is about to draw), walks the tree of action sequences by UCB1,
+    expands one node and finishes the horizon with rollout_policy. Passing
+    a trained policy as rollout_policy makes act() one step of policy
+    improvement over it.
+    """
+
+    def __init__(self, config=None, rollouts=1000, horizon=60, rollout_policy=None, exploration=10.0, seed=0):
+        self.sim = WorkplaceEnv(config=config, lean=True, recent_tasks=0)
+        self.rollouts = rollouts
+        self.horizon = horizon
+        self.rollout_policy = rollout_policy or busy_policy(self.sim.MAX_WORKING_TASKS)
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self._snapshot = None
+
+    def act(self, env):
+        self._snapshot = env.get_state(out=self._snapshot)
+        root = Node()
+        for _ in range(self.rollouts):
+            self.sim.set_state(self._snapshot)
+            self.sim.random.seed(self.rng.getrandbits(64))
+            self._simulate(root)
+        return max(root.children, key=lambda action: root.children[action].visits)
+
+    def _select(self, node):
+        log_visits = math.log(node.visits)
+        return max(
+            node.children.items(),
+            key=lambda item: item[1].value / item[1].visits
+            + self.exploration * math.sqrt(log_visits / item[1].visits),
+        )
+
+    def _simulate(self, root):
+        sim = self.sim
+        node = root
+        path = [root]
+        total_reward = 0
+        steps = 0
+        done = False
+        obs = sim._get_observation()
+
+        while not done and steps < self.horizon:
+            if node.actions is None:
+                node.actions = valid_actions(sim)
+            if len(node.children) < len(node.actions):
+                action = node.actions[len(node.children)]
+                node.children[action] = Node()
+                node = node.children[action]
+            else:
+                action, node = self._select(node)
+            obs, reward, done, _, _ = sim.step(action)
+            total_reward += reward
+            steps += 1
+            path.append(node)
+            if node.visits == 0:
+                break
+
+        while not done and steps < self.horizon:
+            obs, reward, done, _, _ = sim.step(self.rollout_policy(obs))
+            total_reward += reward
+            steps += 1
+
+        for node in path:
+            node.visits += 1
+            node.value += total_reward
+
+
+def snapshot_timings(config, repeats=200):
+    """Microseconds per get_state, set_state and deepcopy of a mid-episode env"""
+    env = WorkplaceEnv(config=config)
+    env.reset(seed=0)
+    act = busy_policy(env.MAX_WORKING_TASKS)
+    obs = env._get_observation()
+    for _ in range(config.total_minutes // 2):
+        obs, _, done, _, _ = env.step(act(obs))
+        if done:
+            break
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        state = env.get_state()
+    get_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        env.set_state(state)
+    set_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats // 10):
+        copy.deepcopy(env)
+    copy_time = time.perf_counter() - start
+
+    return {
+        "get_us": get_time / repeats * 1e6,
+        "set_us": set_time / repeats * 1e6,
+        "deepcopy_us": copy_time / (repeats // 10) * 1e6,
+        "bytes": state.nbytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the lookahead planner with its rollout policy")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="default")
+    parser.add_argument("--bank", help="scenario bank to evaluate on instead of seeded episodes")
+    parser.add_argument("--episodes", type=int, default=5)
+    parser.add_argument("--rollouts", type=int, default=500)
+    parser.add_argument("--horizon", type=int, default=60)
+    args = parser.parse_args()
+
+    bank = None
+    if args.bank:
+        from environment.scenario_bank import ScenarioBank
+        bank = ScenarioBank(args.bank)
+    config = bank.config if bank is not None else get_scenario(args.scenario)
+
+    timings = snapshot_timings(config)
+    print(f"Snapshot of a mid-episode {config.name} env: {timings['bytes']:,} bytes")
+    print(
+        f"  get_state {timings['get_us']:.0f} us, set_state {timings['set_us']:.0f} us, "
+        f"deepcopy {timings['deepcopy_us']:.0f} us"
+    )
+
+    env = WorkplaceEnv(config=config, scenario_bank=bank)
+    scenarios = range(args.episodes) if bank is not None else None
+    planner = LookaheadPlanner(config, args.rollouts, args.horizon)
+
+    env.reset(seed=0)
+    baseline = evaluate_policy(planner.rollout_policy, env, args.episodes, scenarios=scenarios)
+
+    print(f"\nPlanning with {args.rollouts} rollouts of {args.horizon} minutes per decision...")
+    env.reset(seed=0)
+    start = time.time()
+    planned = evaluate_policy(lambda obs: planner.act(env), env, args.episodes, scenarios=scenarios)
+    elapsed = time.time() - start
+    decisions = sum(planned["survival_times"])
+
+    print(f"  Rollout policy: {np.mean(baseline['rewards']):.2f} +/- {np.std(baseline['rewards']):.2f}")
+    print(f"  Planner: {np.mean(planned['rewards']):.2f} +/- {np.std(planned['rewards']):.2f}")
+    print(f"  {decisions / elapsed:.1f} decisions/s, {decisions * args.rollouts / elapsed:,.0f} rollouts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import numpy as np
+import torch as th
+import torch.nn.functional as F
+from stable_baselines3 import DQN
+from stable_baselines3.common.buffers import ReplayBuffer
+from stable_baselines3.common.type_aliases import ReplayBufferSamples
+
+
+class SumTree:
+    """Binary sum-tree stored in one flat array.
+
+    Node i has children 2i and 2i + 1, the root is node 1 and the leaves
+    sit at [size, 2 * size). Sampling and updates walk one level at a time
+    for the whole batch at once, so both cost O(log n) numpy operations.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.depth = max(0, (capacity - 1).bit_length())
+        self.size = 1 << self.depth
+        self.tree = np.zeros(2 * self.size, dtype=np.float64)
+
+    def total(self):
+        return self.tree[1]
+
+    def get(self, indices):
+        return self.tree[np.asarray(indices) + self.size]
+
+    def update(self, indices, priorities):
+        nodes = np.asarray(indices, dtype=np.int64) + self.size
+        self.tree[nodes] = priorities
+
+        if len(nodes) == 1:
+            node = int(nodes[0]) // 2
+            while node >= 1:
+                self.tree[node] = self.tree[2 * node] + self.tree[2 * node + 1]
+                node //= 2
+            return
+
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values):
+        """Leaf index for each prefix-sum value in [0, total)"""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            # Never step into an empty right subtree because of rounding
+            go_right = (values >= left_sum) & (self.tree[left + 1] > 0)
+            values -= left_sum * go_right
+            nodes = left + go_right
+
+        return nodes - self.size
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """Replay buffer sampling transitions proportionally to |TD error| ** alpha.
+
+    Each (position, env) slot of the SB3 buffer is a leaf of a SumTree; new
+    transitions get the largest priority seen so far so they are replayed
+    at least once before their TD error is known.
+    """
+
+    def __init__(
+        self,
+        buffer_size,
+        observation_space,
+        action_space,
+        device="auto",
+        n_envs=1,
+        optimize_memory_usage=False,
+        handle_timeout_termination=True,
+        alpha=0.6,
+        epsilon=1e-6,
+    ):
+        if optimize_memory_usage:
+            raise ValueError("PrioritizedReplayBuffer does not support optimize_memory_usage")
+
+        super().__init__(
+            buffer_size,
+            observation_space,
+            action_space,
+            device=device,
+            n_envs=n_envs,
+            optimize_memory_usage=False,
+            handle_timeout_termination=handle_timeout_termination,
+        )
+        self.alpha = alpha
+        self.epsilon = epsilon
+        self.max_priority = 1.0
+        self.tree = SumTree(self.buffer_size * self.n_envs)
+        self._env_offsets = np.arange(self.n_envs)
+
+    def add(self, obs, next_obs, action, reward, done, infos):
+        leaves = self.pos * self.n_envs + self._env_offsets
+        super().add(obs, next_obs, action, reward, done, infos)
+        self.tree.update(leaves, np.full(self.n_envs, self.max_priority ** self.alpha))
+
+    def sample(self, batch_size, env=None):
+        return self.sample_prioritized(batch_size, beta=0.0, env=env)[0]
+
+    def sample_prioritized(self, batch_size, beta, env=None):
+        """Stratified sample; returns (samples, leaf indices, importance-sampling weights)"""
+        total = self.tree.total()
+        segment = total / batch_size
+        values = (np.arange(batch_size) + np.random.uniform(size=batch_size)) * segment
+        leaves = self.tree.find(np.minimum(values, np.nextafter(total, 0)))
+
+        stored = (self.buffer_size if self.full else self.pos) * self.n_envs
+        probs = self.tree.get(leaves) / total
+        weights = (stored * probs) ** -beta
+        weights /= weights.max()
+
+        samples = self._get_samples_at(leaves // self.n_envs, leaves % self.n_envs, env)
+        return samples, leaves, self.to_torch(weights.astype(np.float32).reshape(-1, 1))
+
+    def update_priorities(self, leaves, td_errors):
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(leaves, priorities ** self.alpha)
+
+    def _get_samples_at(self, batch_inds, env_indices, env=None):
+        data = (
+            self._normalize_obs(self.observations[batch_inds, env_indices, :], env),
+            self.actions[batch_inds, env_indices, :],
+            self._normalize_obs(self.next_observations[batch_inds, env_indices, :], env),
+            (self.dones[batch_inds, env_indices] * (1 - self.timeouts[batch_inds, env_indices])).reshape(-1, 1),
+            self._normalize_reward(self.rewards[batch_inds, env_indices].reshape(-1, 1), env),
+        )
+        return ReplayBufferSamples(*tuple(map(self.to_torch, data)))
+
+
+class PrioritizedDQN(DQN):
+    """DQN trained from a PrioritizedReplayBuffer with importance-sampling corrected loss.
+
+    beta is annealed linearly from `beta` to `beta_final` over the training run.
+    By default a run is one learn() call; with schedule_timesteps set, beta and
+    the exploration rate follow that many total steps instead, so a run split
+    over several learn() calls anneals exactly like one uninterrupted call.
+    """
+
+    def __init__(self, policy, env, alpha=0.6, beta=0.4, beta_final=1.0, schedule_timesteps=None, **kwargs):
+        self.beta = beta
+        self.beta_final = beta_final
+        self.schedule_timesteps = schedule_timesteps
+        kwargs.setdefault("replay_buffer_class", PrioritizedReplayBuffer)
+        if kwargs["replay_buffer_class"] is PrioritizedReplayBuffer:
+            kwargs["replay_buffer_kwargs"] = {"alpha": alpha, **(kwargs.get("replay_buffer_kwargs") or {})}
+        super().__init__(policy, env, **kwargs)
+
+    def _update_current_progress_remaining(self, num_timesteps, total_timesteps):
+        if self.schedule_timesteps:
+            total_timesteps = self.schedule_timesteps
+        self._current_progress_remaining = max(0.0, 1.0 - float(num_timesteps) / float(total_timesteps))
+
+    def _current_beta(self):
+        progress = 1.0 - self._current_progress_remaining
+        return self.beta + progress * (self.beta_final - self.beta)
+
+    def train(self, gradient_steps, batch_size=100):
+        self.policy.set_training_mode(True)
+        self._update_learning_rate(self.policy.optimizer)
+
+        losses = []
+        for _ in range(gradient_steps):
+            replay_data, leaves, weights = self.replay_buffer.sample_prioritized(
+                batch_size, self._current_beta(), env=self._vec_normalize_env
+            )
+            discounts = getattr(replay_data, "discounts", None)
+            if discounts is None:
+                discounts = self.gamma
+
+            with th.no_grad():
+                next_q_values = self.q_net_target(replay_data.next_observations)
+                next_q_values, _ = next_q_values.max(dim=1)
+                next_q_values = next_q_values.reshape(-1, 1)
+                target_q_values = replay_data.rewards + (1 - replay_data.dones) * discounts * next_q_values
+
+            current_q_values = self.q_net(replay_data.observations)
+            current_q_values = th.gather(current_q_values, dim=1, index=replay_data.actions.long())
+
+            elementwise_loss = F.smooth_l1_loss(current_q_values, target_q_values, reduction="none")
+            loss = (weights * elementwise_loss).mean()
+            losses.append(loss.item())
+
+            self.policy.optimizer.zero_grad()
+            loss.backward()
+            th.nn.utils.clip_grad_norm_(self.policy.parameters(), self.max_grad_norm)
+            self.policy.optimizer.step()
+
+            td_errors = (current_q_values - target_q_values).detach().cpu().numpy().ravel()
+            self.replay_buffer.update_priorities(leaves, td_errors)
+
+        self._n_updates += gradient_steps
+
+        self.logger.record("train/n_updates", self._n_updates, exclude="tensorboard")
+        self.logger.record("train/loss", np.mean(losses))
+        self.logger.record("train/per_beta", self._current_beta())
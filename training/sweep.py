@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# ("log", low, high) samples log-uniformly, ("uniform", low, high) uniformly,
+# and a list is a categorical choice.
+SEARCH_SPACES = {
+    "ppo": {
+        "learning_rate": ("log", 1e-5, 1e-3),
+        "n_steps": [1024, 2048, 4096],
+        "batch_size": [64, 128, 256],
+        "gamma": [0.95, 0.99, 0.995],
+        "ent_coef": ("log", 1e-4, 5e-2),
+    },
+    "dqn": {
+        "learning_rate": ("log", 1e-5, 1e-3),
+        "buffer_size": [50000, 100000, 200000],
+        "exploration_fraction": ("uniform", 0.1, 0.6),
+        "batch_size": [32, 64, 128],
+        "target_update_interval": [1000, 5000, 10000],
+        "alpha": ("uniform", 0.4, 0.8),
+    },
+    "pg": {
+        "lr": ("log", 1e-4, 1e-2),
+    },
+}
+
+
+def sample_config(space, rng):
+    config = {}
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            config[name] = rng.choice(spec)
+        elif spec[0] == "log":
+            config[name] = math.exp(rng.uniform(math.log(spec[1]), math.log(spec[2])))
+        else:
+            config[name] = rng.uniform(spec[1], spec[2])
+    return config
+
+
+class TrialStore:
+    """Append-only JSON lines file holding one record per evaluated rung"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def append(self, record):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def records(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def best(self):
+        # Only trust scores measured at the largest budget any trial reached
+        records = self.records()
+        if not records:
+            return None
+        max_steps = max(r["steps"] for r in records)
+        finalists = [r for r in records if r["steps"] == max_steps]
+        return max(finalists, key=lambda r: r["mean_reward"])
+
+
+def run_trial(algo, trial_dir, params, start_steps, target_steps, eval_episodes, seed, max_steps=None):
+    """Train one trial from its checkpoint up to target_steps and evaluate it.
+
+    Schedules span max_steps (the largest budget of the sweep), so a trial
+    continued rung after rung trains exactly like one run of that length.
+    """
+    import torch
+
+    from environment.custom_env import WorkplaceEnv
+    from training.dqn_training import (
+        evaluate_model,
+        make_dqn,
+        make_pg,
+        make_ppo,
+        run_pg_episode,
+    )
+    from training.pg_training import PolicyGradient
+
+    torch.set_num_threads(1)
+    os.makedirs(trial_dir, exist_ok=True)
+    start = time.time()
+    env = WorkplaceEnv()
+    budget = target_steps - start_steps
+
+    if algo == "pg":
+        checkpoint = os.path.join(trial_dir, "model.pth")
+        if start_steps > 0:
+            agent = PolicyGradient.load(checkpoint)
+        else:
+            torch.manual_seed(seed)
+            agent = make_pg(env, **params)
+
+        steps = 0
+        while steps < budget:
+            _, episode_steps, _ = run_pg_episode(agent, env)
+            steps += episode_steps
+        agent.save(checkpoint)
+
+        results = {"rewards": [], "survival_times": [], "trust_points": []}
+        for _ in range(eval_episodes):
+            obs, _ = env.reset()
+            total_reward = 0
+            done = False
+            while not done:
+                action = agent.select_action(obs, env.action_masks())
+                obs, reward, done, _, info = env.step(action)
+                total_reward += reward
+            agent.saved_log_probs.clear()
+            results["rewards"].append(total_reward)
+            results["survival_times"].append(env.current_time)
+            results["trust_points"].append(info["trust_points"])
+    else:
+        from stable_baselines3 import PPO
+        from stable_baselines3.common.vec_env import DummyVecEnv
+
+        from training.prioritized_replay import PrioritizedDQN
+
+        checkpoint = os.path.join(trial_dir, "model")
+        replay_buffer = os.path.join(trial_dir, "replay_buffer.pkl")
+        if start_steps > 0:
+            if algo == "ppo":
+                model = PPO.load(checkpoint, env=DummyVecEnv([lambda: env]), device="cpu")
+            else:
+                model = PrioritizedDQN.load(checkpoint, env=env, device="cpu")
+                model.load_replay_buffer(replay_buffer)
+        elif algo == "ppo":
+            model = make_ppo(env, seed=seed, **params)
+        else:
+            model = make_dqn(env, seed=seed, **params)
+        if algo == "dqn":
+            model.schedule_timesteps = max_steps or target_steps
+
+        model.learn(total_timesteps=budget, reset_num_timesteps=start_steps == 0)
+        model.save(checkpoint)
+        if algo == "dqn":
+            # Only a trial that can still be promoted needs its replay buffer
+            if target_steps < (max_steps or target_steps):
+                model.save_replay_buffer(replay_buffer)
+            elif os.path.exists(replay_buffer):
+                os.remove(replay_buffer)
+        results = evaluate_model(model, env, eval_episodes)
+
+    return {
+        "mean_reward": float(np.mean(results["rewards"])),
+        "std_reward": float(np.std(results["rewards"])),
+        "survival_rate": float(np.mean([t >= env.TOTAL_MINUTES for t in results["survival_times"]])),
+        "wall_time": time.time() - start,
+    }
+
+
+def successive_halving(algo, configs, min_steps, max_steps, eta, pool, store,
+                       sweep_dir, eval_episodes=20, bracket=0, first_trial_id=0):
+    """Train every config for min_steps, keep the best 1/eta, multiply the budget by eta, repeat"""
+    trials = [
+        {"trial_id": first_trial_id + i, "params": params, "steps": 0}
+        for i, params in enumerate(configs)
+    ]
+    rung = 0
+    rung_steps = min_steps
+
+    while trials:
+        print(f"  [{algo}] bracket {bracket} rung {rung}: {len(trials)} trials at {rung_steps:,} steps")
+        futures = [
+            pool.submit(
+                run_trial,
+                algo,
+                os.path.join(sweep_dir, f"trial_{trial['trial_id']}"),
+                trial["params"],
+                trial["steps"],
+                rung_steps,
+                eval_episodes,
+                trial["trial_id"],
+                max_steps,
+            )
+            for trial in trials
+        ]
+
+        for trial, future in zip(trials, futures):
+            result = future.result()
+            trial["steps"] = rung_steps
+            trial["score"] = result["mean_reward"]
+            store.append({
+                "algo": algo,
+                "trial_id": trial["trial_id"],
+                "bracket": bracket,
+                "rung": rung,
+                "steps": rung_steps,
+                "params": trial["params"],
+                **result,
+            })
+            print(f"    trial {trial['trial_id']}: {result['mean_reward']:.2f} ({result['wall_time']:.0f}s)")
+
+        if rung_steps >= max_steps or len(trials) == 1:
+            break
+
+        trials.sort(key=lambda t: t["score"], reverse=True)
+        trials = trials[:max(1, len(trials) // eta)]
+        rung_steps = min(rung_steps * eta, max_steps)
+        rung += 1
+
+    return max(trials, key=lambda t: t["score"])
+
+
+def hyperband(algo, max_steps, min_steps, eta, pool, store, sweep_dir, rng, eval_episodes=20):
+    """Run successive halving brackets trading the number of configs against their starting budget"""
+    s_max = int(math.log(max_steps / min_steps, eta) + 1e-9)
+    best = None
+    trial_id = 0
+
+    for s in reversed(range(s_max + 1)):
+        n_configs = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        start_steps = int(max_steps * eta ** -s)
+        configs = [sample_config(SEARCH_SPACES[algo], rng) for _ in range(n_configs)]
+
+        winner = successive_halving(
+            algo, configs, start_steps, max_steps, eta, pool, store, sweep_dir,
+            eval_episodes, bracket=s_max - s, first_trial_id=trial_id,
+        )
+        trial_id += n_configs
+        if best is None or winner["score"] > best["score"]:
+            best = winner
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep for the workplace agents")
+    parser.add_argument("--algo", choices=sorted(SEARCH_SPACES), required=True)
+    parser.add_argument("--mode", choices=["hyperband", "halving"], default="hyperband")
+    parser.add_argument("--trials", type=int, default=27, help="configs for --mode halving")
+    parser.add_argument("--min-steps", type=int, default=480 * 25)
+    parser.add_argument("--max-steps", type=int, default=480 * 2000)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--eval-episodes", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="sweeps")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sweep_dir = os.path.join(args.out, args.algo)
+    store = TrialStore(os.path.join(sweep_dir, "trials.jsonl"))
+
+    print(f"Sweeping {args.algo.upper()} with {args.workers} workers ({args.mode})")
+    start = time.time()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        if args.mode == "hyperband":
+            best = hyperband(
+                args.algo, args.max_steps, args.min_steps, args.eta, pool, store,
+                sweep_dir, rng, args.eval_episodes,
+            )
+        else:
+            configs = [sample_config(SEARCH_SPACES[args.algo], rng) for _ in range(args.trials)]
+            best = successive_halving(
+                args.algo, configs, args.min_steps, args.max_steps, args.eta, pool,
+                store, sweep_dir, args.eval_episodes,
+            )
+
+    print(f"\nSweep finished in {time.time() - start:.1f} seconds")
+    print(f"  Best trial {best['trial_id']}: {best['score']:.2f} after {best['steps']:,} steps")
+    print(f"  Params: {json.dumps(best['params'])}")
+    print(f"  All results in {store.path}")
+
+
+if __name__ == "__main__":
+    main()
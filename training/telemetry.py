@@ -0,0 +1,179 @@
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+MAGIC = 0x4C504B57
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "<i8"),
+    ("slots", "<i8"),
+    ("capacity", "<i8"),
+    ("closed", "<i8"),
+    ("created", "<f8"),
+])
+SLOT_DTYPE = np.dtype([
+    ("label", "S32"),
+    ("count", "<i8"),
+    ("writing", "<i8"),
+    ("started", "<f8"),
+])
+RECORD_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("steps", "<i8"),
+    ("reward", "<f8"),
+    ("survival_time", "<i4"),
+    ("survived", "<i4"),
+    ("trust", "<f8"),
+])
+
+
+def _attach_untracked(name):
+    # Before Python 3.13 attaching registers the segment with the resource
+    # tracker, which would unlink it under the owner when this process exits
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class TelemetryBuffer:
+    """Per-episode training telemetry in a named shared-memory segment.
+
+    The segment holds one ring of `capacity` episode records per slot, and
+    every slot has exactly one writer (a training loop), so no locks are
+    needed: a writer announces the record it is about to fill in the slot's
+    writing counter, fills it and then publishes it by bumping the slot's
+    count. Readers copy the records below the count and drop only those a
+    write begun meanwhile may have overwritten. Readers never block or slow
+    down a writer and can attach and detach at any time.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((), HEADER_DTYPE, shm.buf)
+        if int(self.header["magic"]) != MAGIC:
+            raise ValueError(f"{shm.name} is not a telemetry segment")
+        self.slots = int(self.header["slots"])
+        self.capacity = int(self.header["capacity"])
+        self._slots = np.ndarray((self.slots,), SLOT_DTYPE, shm.buf, HEADER_DTYPE.itemsize)
+        self._records = np.ndarray(
+            (self.slots, self.capacity),
+            RECORD_DTYPE,
+            shm.buf,
+            HEADER_DTYPE.itemsize + self.slots * SLOT_DTYPE.itemsize,
+        )
+
+    @classmethod
+    def create(cls, name, slots, capacity=1024):
+        size = HEADER_DTYPE.itemsize + slots * (SLOT_DTYPE.itemsize + capacity * RECORD_DTYPE.itemsize)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((), HEADER_DTYPE, shm.buf)
+        header[()] = (MAGIC, slots, capacity, 0, time.time())
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Open a run's segment by name; raises FileNotFoundError while it does not exist"""
+        return cls(_attach_untracked(name), owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def closed(self):
+        return bool(self.header["closed"])
+
+    def writer(self, slot, label, total_minutes):
+        return TelemetryWriter(self, slot, label, total_minutes)
+
+    def label(self, slot):
+        return self._slots["label"][slot].decode()
+
+    def read(self, slot, last=None):
+        """Copy of the newest published records of a slot, oldest first"""
+        count = int(self._slots["count"][slot])
+        n = min(count, self.capacity, last or self.capacity)
+        records = self._records[slot][np.arange(count - n, count) % self.capacity]
+
+        # Record k is overwritten once the writer starts on k + capacity
+        writing = int(self._slots["writing"][slot])
+        skip = max(0, writing - self.capacity - (count - n))
+        return records[skip:]
+
+    def episodes(self, slot):
+        return int(self._slots["count"][slot])
+
+    def active_slots(self):
+        return [slot for slot in range(self.slots) if self._slots["started"][slot] > 0]
+
+    def close(self):
+        """Detach; the owner also marks the run finished and removes the segment"""
+        if self.owner:
+            self.header["closed"] = 1
+        # The mapping can only close once no numpy view into it is left;
+        # otherwise it goes away with the last writer that still holds one
+        del self.header, self._slots, self._records
+        try:
+            self.shm.close()
+        except BufferError:
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+class TelemetryWriter:
+    """The single writer of one slot; called once per finished episode"""
+
+    def __init__(self, buffer, slot, label, total_minutes):
+        self.records = buffer._records[slot]
+        self.capacity = buffer.capacity
+        self.total_minutes = total_minutes
+        self._count = buffer._slots["count"][slot:slot + 1]
+        self._writing = buffer._slots["writing"][slot:slot + 1]
+        self.count = int(self._count[0])
+        self.steps = int(self.records[(self.count - 1) % self.capacity]["steps"]) if self.count else 0
+
+        buffer._slots["label"][slot] = label.encode()[:SLOT_DTYPE["label"].itemsize]
+        buffer._slots["started"][slot] = time.time()
+
+    def episode(self, reward, steps, survival_time, trust):
+        self.steps += steps
+        self._writing[0] = self.count + 1
+        self.records[self.count % self.capacity] = (
+            time.time(),
+            self.steps,
+            reward,
+            survival_time,
+            survival_time >= self.total_minutes,
+            trust,
+        )
+        self.count += 1
+        self._count[0] = self.count
+
+
+def slot_stats(records, window=100):
+    """Steps/s, rolling reward, survival rate and trust over the last window episodes"""
+    recent = records[-window:]
+    if len(recent) == 0:
+        return None
+    steps_per_sec = 0.0
+    if len(recent) > 1 and recent["time"][-1] > recent["time"][0]:
+        steps_per_sec = (recent["steps"][-1] - recent["steps"][0]) / (recent["time"][-1] - recent["time"][0])
+    return {
+        "steps": int(recent["steps"][-1]),
+        "steps_per_sec": float(steps_per_sec),
+        "reward": float(recent["reward"].mean()),
+        "survival_rate": float(recent["survived"].mean()),
+        "trust": float(recent["trust"].mean()),
+        "rewards": recent["reward"].copy(),
+        "age": time.time() - float(recent["time"][-1]),
+    }